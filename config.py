@@ -45,11 +45,11 @@ class Config:
 
     # カラー設定
     COLORS = {
-        "BLACK": (0, 0, 0, 255),
-        "WHITE": (255, 255, 255, 255),
-        "PURPLE": (70, 20, 190, 255),
-        "BLUE": (70, 65, 225, 255),
-        "RED": (230, 70, 70, 255),
+        "BLACK": (0, 0, 0),
+        "WHITE": (255, 255, 255),
+        "PURPLE": (70, 20, 190),
+        "BLUE": (70, 65, 225),
+        "RED": (230, 70, 70),
     }
 
     # フォールバック四字熟語
@@ -1,10 +1,14 @@
 import os
 import logging
+import operator
 import re
-from itertools import product
-import shutil
+from functools import reduce
+from itertools import chain
 import subprocess
 import tempfile
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator
 from PIL import Image, ImageDraw, ImageFont
 
 # ログ設定
@@ -14,13 +18,47 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # カラー定義
-BLACK = (0, 0, 0, 255)
-WHITE = (255, 255, 255, 255)
-PURPLE = (70, 20, 190, 255)
-BLUE = (70, 65, 225, 255)
-RED = (230, 70, 70, 255)
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+PURPLE = (70, 20, 190)
+BLUE = (70, 65, 225)
+RED = (230, 70, 70)
 # RGB画像で使うため、透明度ではなく白寄りの赤で表現する
 RED_SOFT = (255, 170, 170)
+# グレースケールの字形でこの値未満の画素を黒とみなす（アンチエイリアス対策）
+BLACK_THRESHOLD = 128
+# 二値化用の変換表（画素ごとにPythonを呼ばずにC側で引く）
+BLACK_MASK_LUT = [255 if v < BLACK_THRESHOLD else 0 for v in range(256)]
+# 出力画像はPモード（1画素1バイトの色番号）で描き、色はパレットで引く
+PALETTE_COLORS = (WHITE, BLACK, PURPLE, BLUE, RED, RED_SOFT)
+PALETTE_INDEX = {color: index for index, color in enumerate(PALETTE_COLORS)}
+PALETTE = [value for color in PALETTE_COLORS for value in color]
+# 解答画像の色番号を問題画像の色番号に変換する表（共通部分のみ黒、他は白）
+QUESTION_INDEX_LUT = [PALETTE_INDEX[WHITE]] * 256
+QUESTION_INDEX_LUT[PALETTE_INDEX[PURPLE]] = PALETTE_INDEX[BLACK]
+
+
+def _rgb_to_yuv(color: tuple) -> tuple:
+    """RGBをBT.601（リミテッドレンジ）のYUVに変換"""
+    r, g, b = color
+    y = 16 + (65.481 * r + 128.553 * g + 24.966 * b) / 255
+    u = 128 + (-37.797 * r - 74.203 * g + 112.0 * b) / 255
+    v = 128 + (112.0 * r - 93.786 * g - 18.214 * b) / 255
+    return tuple(min(255, max(0, round(value))) for value in (y, u, v))
+
+
+# 動画フレームの色番号からY/U/V各平面の値を引く表（ffmpeg側のRGB→YUV変換を省く）
+YUV_PALETTE = [_rgb_to_yuv(color) for color in PALETTE_COLORS]
+Y_INDEX_LUT, U_INDEX_LUT, V_INDEX_LUT = (
+    [yuv[plane] for yuv in YUV_PALETTE] + [0] * (256 - len(YUV_PALETTE))
+    for plane in range(3)
+)
+# 字形をラスタライズするサイズ（キャンバスより小さい場合は拡大してから二値化）
+GLYPH_RASTER_SIZE = 1024
+# PNGの圧縮レベル（白黒主体の画像はレベル1でも十分小さい）
+PNG_COMPRESS_LEVEL = 1
+# 文字マスクのキャッシュ上限（1件あたり約128KB）
+MASK_CACHE_SIZE = 256
 
 
 class ImageGenerator:
@@ -29,8 +67,9 @@ class ImageGenerator:
     def __init__(self, images_dir: str = "images"):
         self.images_dir = images_dir
         self.background_size = (1024, 1024)
-        self.background_color = (255, 255, 255, 255)
-        self.text_color = BLACK
+        # 字形はグレースケール（L）で描画する
+        self.background_color = 255
+        self.text_color = 0
 
         # 画像ディレクトリを作成
         os.makedirs(self.images_dir, exist_ok=True)
@@ -51,9 +90,20 @@ class ImageGenerator:
         }
         self.font_key_order = ["mincho", "monogothic", "hiragino", "dejavu"]
         self.font_key_pattern = re.compile(r"^[A-Za-z0-9]{2,10}$")
+        self._valid_font_keys = frozenset(self.font_key_map) | {"default"}
+        # (フォントパス, サイズ) ごとに読み込み済みフォントを保持
+        self._font_cache = {}
+        # (文字, フォント識別子) ごとの黒マスクをLRUで保持
+        self._mask_cache = OrderedDict()
+        self._mask_cache_lock = threading.Lock()
 
         self.font = self._get_available_font()
         self.available_font_keys = self._detect_available_font_keys()
+        self._default_font_key = self._detect_default_font_key()
+        # 利用可能なフォントは起動時に読み込み、リクエスト毎のファイル確認を省く
+        self._fonts = {}
+        for key in self.available_font_keys:
+            self._fonts[key] = self._load_font(self.font_key_map[key])
 
     def _detect_available_font_keys(self) -> list:
         available = []
@@ -69,21 +119,32 @@ class ImageGenerator:
         if not os.path.exists(font_path):
             return False
         try:
-            ImageFont.truetype(font_path, 10)
+            self._load_font(font_path)
             return True
         except Exception as e:
             logger.warning(f"フォント読み込み失敗: {font_path} - {e}")
             return False
 
+    def _load_font(
+        self, font_path: str, size: int = GLYPH_RASTER_SIZE
+    ) -> ImageFont.FreeTypeFont:
+        """フォントを読み込む（読み込み済みならキャッシュを返す）"""
+        cache_key = (font_path, size)
+        font = self._font_cache.get(cache_key)
+        if font is None:
+            font = ImageFont.truetype(font_path, size)
+            self._font_cache[cache_key] = font
+        return font
+
     def _get_available_font(self) -> ImageFont.ImageFont:
         """利用可能なフォントを取得"""
-        text_size = 1024
+        text_size = GLYPH_RASTER_SIZE
 
         for font_path in self.default_font_paths:
             try:
                 if os.path.exists(font_path):
                     logger.info(f"フォントを使用: {font_path}")
-                    return ImageFont.truetype(font_path, text_size)
+                    return self._load_font(font_path, text_size)
             except Exception as e:
                 logger.warning(f"フォント読み込み失敗: {font_path} - {e}")
                 continue
@@ -98,6 +159,9 @@ class ImageGenerator:
 
     def get_default_font_key(self) -> str:
         """デフォルトで選ばれるフォント識別子を取得"""
+        return self._default_font_key
+
+    def _detect_default_font_key(self) -> str:
         for font_path in self.default_font_paths:
             if not os.path.exists(font_path):
                 continue
@@ -111,158 +175,127 @@ class ImageGenerator:
         """フォント識別子を正規化"""
         if not font_key:
             return "default"
+        if font_key in self._valid_font_keys:
+            return font_key
+        # 以下は不正な識別子のエラーメッセージを出し分けるためだけに判定する
         if not self.font_key_pattern.match(font_key):
             raise ValueError("フォント識別子は2-10文字の英数字で指定してください。")
-        if font_key != "default" and font_key not in self.font_key_map:
-            raise ValueError("指定されたフォントは利用できません。")
-        return font_key
+        raise ValueError("指定されたフォントは利用できません。")
 
     def _get_font_for_key(self, font_key: str) -> ImageFont.ImageFont:
         """フォント識別子からフォントを取得"""
         if font_key == "default":
             return self.font
 
-        font_path = self.font_key_map.get(font_key)
-        if not font_path or not os.path.exists(font_path):
-            raise ValueError("指定されたフォントは利用できません。")
-
-        try:
-            return ImageFont.truetype(font_path, 1024)
-        except Exception as e:
-            logger.warning(f"フォント読み込み失敗: {font_path} - {e}")
+        font = self._fonts.get(font_key)
+        if font is None:
             raise ValueError("指定されたフォントは利用できません。")
+        return font
 
     def _create_kanji_image(self, char: str, font: ImageFont.ImageFont) -> Image.Image:
         """漢字の画像を作成"""
-        kanji_image = Image.new("RGBA", self.background_size, self.background_color)
+        raster_size = (GLYPH_RASTER_SIZE, GLYPH_RASTER_SIZE)
+        kanji_image = Image.new("L", raster_size, self.background_color)
         draw = ImageDraw.Draw(kanji_image)
         draw.text((0, 0), char, font=font, fill=self.text_color)
+        if raster_size != self.background_size:
+            # 二値化前のグレースケールで拡大し、輪郭のギザつきを抑える
+            kanji_image = kanji_image.resize(self.background_size, Image.BILINEAR)
         return kanji_image
 
-    def _process_pixels(self, kanji1: Image.Image, kanji2: Image.Image) -> tuple:
-        """ピクセル処理で問題画像と解答画像を生成"""
-        p1 = kanji1.load()
-        p2 = kanji2.load()
-
-        # 問題画像
-        q_image = Image.new("RGB", (1024, 1024))
-        q_pix = q_image.load()
-
-        # 解答画像
-        a_image = Image.new("RGB", (1024, 1024))
-        a_pix = a_image.load()
-
-        for x, y in product(*map(range, (1024, 1024))):
-            if p1[x, y] == BLACK:
-                if p2[x, y] == BLACK:
-                    a_pix[x, y] = PURPLE  # 共通部分
-                    q_pix[x, y] = BLACK
-                else:
-                    a_pix[x, y] = BLUE  # 1文字目のみ
-                    q_pix[x, y] = WHITE
-            else:
-                q_pix[x, y] = WHITE
-                if p2[x, y] == BLACK:
-                    a_pix[x, y] = RED  # 2文字目のみ
-                else:
-                    a_pix[x, y] = WHITE  # 共通部分なし
+    def _black_mask(self, kanji: Image.Image) -> Image.Image:
+        """黒ピクセルを255とする2値マスクを作成"""
+        return kanji.point(BLACK_MASK_LUT, "1")
+
+    def _pack_mask(self, mask: Image.Image) -> int:
+        """2値マスクを1画素1bitの整数ビット列に詰める"""
+        return int.from_bytes(mask.tobytes(), "big")
+
+    def _unpack_mask(self, bits: int) -> Image.Image:
+        """整数ビット列を2値マスク画像に戻す"""
+        width, height = self.background_size
+        row_bytes = (width + 7) // 8
+        data = bits.to_bytes(row_bytes * height, "big")
+        return Image.frombytes("1", self.background_size, data)
+
+    def _get_kanji_mask(self, char: str, font_key: str) -> int:
+        """文字の黒マスク（ビット列）を取得（描画済みならキャッシュを返す）"""
+        cache_key = (char, font_key)
+        with self._mask_cache_lock:
+            bits = self._mask_cache.get(cache_key)
+            if bits is not None:
+                self._mask_cache.move_to_end(cache_key)
+                return bits
+
+        font = self._get_font_for_key(font_key)
+        bits = self._pack_mask(self._black_mask(self._create_kanji_image(char, font)))
+
+        with self._mask_cache_lock:
+            self._mask_cache[cache_key] = bits
+            while len(self._mask_cache) > MASK_CACHE_SIZE:
+                self._mask_cache.popitem(last=False)
+        return bits
+
+    def _new_palette_image(self) -> Image.Image:
+        """白で塗りつぶしたパレット画像を作成"""
+        image = Image.new("P", self.background_size, PALETTE_INDEX[WHITE])
+        image.putpalette(PALETTE)
+        return image
+
+    # 以下の _process_* は文字マスクを整数ビット列で受け取り、
+    # 集合演算を整数のビット演算（8画素/バイト）で行う
+
+    def _process_pixels(self, bits1: int, bits2: int) -> tuple:
+        """マスク合成で問題画像と解答画像を生成"""
+        # 解答画像（後から塗った色が優先される）
+        a_image = self._new_palette_image()
+        a_image.paste(PALETTE_INDEX[BLUE], mask=self._unpack_mask(bits1))  # 1文字目のみ
+        a_image.paste(PALETTE_INDEX[RED], mask=self._unpack_mask(bits2))  # 2文字目のみ
+        common = self._unpack_mask(bits1 & bits2)
+        a_image.paste(PALETTE_INDEX[PURPLE], mask=common)  # 共通部分
+
+        # 問題画像（解答画像の色番号を共通部分だけ黒に振り替える）
+        q_image = a_image.point(QUESTION_INDEX_LUT)
 
         return q_image, a_image
 
-    def _process_union_pixels(
-        self, kanji1: Image.Image, kanji2: Image.Image
-    ) -> Image.Image:
-        """ピクセル処理で和集合画像を生成"""
-        p1 = kanji1.load()
-        p2 = kanji2.load()
-
-        u_image = Image.new("RGB", (1024, 1024))
-        u_pix = u_image.load()
-
-        for x, y in product(*map(range, (1024, 1024))):
-            if p1[x, y] == BLACK or p2[x, y] == BLACK:
-                u_pix[x, y] = BLACK
-            else:
-                u_pix[x, y] = WHITE
+    def _process_union_pixels(self, bits1: int, bits2: int) -> Image.Image:
+        """マスク合成で和集合画像を生成"""
+        u_image = self._new_palette_image()
+        u_image.paste(PALETTE_INDEX[BLACK], mask=self._unpack_mask(bits1 | bits2))
 
         return u_image
 
-    def _process_intersection_pixels(self, kanji_images: list) -> Image.Image:
-        """ピクセル処理で共通部分画像を生成"""
-        pixels = [img.load() for img in kanji_images]
-        q_image = Image.new("RGB", (1024, 1024))
-        q_pix = q_image.load()
+    def _process_intersection_pixels(self, masks: list) -> Image.Image:
+        """マスク合成で共通部分画像を生成"""
+        common = reduce(operator.and_, masks)
 
-        for x, y in product(*map(range, (1024, 1024))):
-            all_black = True
-            for p in pixels:
-                if p[x, y] != BLACK:
-                    all_black = False
-                    break
-            q_pix[x, y] = BLACK if all_black else WHITE
+        q_image = self._new_palette_image()
+        q_image.paste(PALETTE_INDEX[BLACK], mask=self._unpack_mask(common))
 
         return q_image
 
-    def _process_union_pixels_multi(self, kanji_images: list) -> Image.Image:
-        """ピクセル処理で和集合画像を生成（多文字対応）"""
-        pixels = [img.load() for img in kanji_images]
-        u_image = Image.new("RGB", (1024, 1024))
-        u_pix = u_image.load()
+    def _process_union_pixels_multi(self, masks: list) -> Image.Image:
+        """マスク合成で和集合画像を生成（多文字対応）"""
+        union = reduce(operator.or_, masks)
 
-        for x, y in product(*map(range, (1024, 1024))):
-            any_black = False
-            for p in pixels:
-                if p[x, y] == BLACK:
-                    any_black = True
-                    break
-            u_pix[x, y] = BLACK if any_black else WHITE
+        u_image = self._new_palette_image()
+        u_image.paste(PALETTE_INDEX[BLACK], mask=self._unpack_mask(union))
 
         return u_image
 
-    def _process_step_pixels(self, kanji_images: list, step_index: int) -> Image.Image:
-        """ピクセル処理で段階画像を生成"""
-        frame = Image.new("RGB", (1024, 1024))
-        frame_pix = frame.load()
-        pixels = [img.load() for img in kanji_images]
-
-        if step_index == 1:
-            p1 = pixels[0]
-            p2 = pixels[1]
-            for x, y in product(*map(range, (1024, 1024))):
-                p1_black = p1[x, y] == BLACK
-                p2_black = p2[x, y] == BLACK
-                if p1_black and p2_black:
-                    frame_pix[x, y] = PURPLE
-                elif p1_black and not p2_black:
-                    frame_pix[x, y] = RED
-                elif not p1_black and p2_black:
-                    frame_pix[x, y] = BLUE
-                else:
-                    frame_pix[x, y] = WHITE
-            return frame
-
-        prefix_end = step_index
-        next_index = step_index
-        for x, y in product(*map(range, (1024, 1024))):
-            prefix_all_black = True
-            prefix_any_black = False
-            for idx in range(prefix_end):
-                if pixels[idx][x, y] == BLACK:
-                    prefix_any_black = True
-                else:
-                    prefix_all_black = False
-            next_black = pixels[next_index][x, y] == BLACK
-
-            if prefix_all_black and not next_black:
-                frame_pix[x, y] = RED
-            elif prefix_all_black and next_black:
-                frame_pix[x, y] = PURPLE
-            elif prefix_any_black and not next_black:
-                frame_pix[x, y] = RED_SOFT
-            elif next_black:
-                frame_pix[x, y] = BLUE
-            else:
-                frame_pix[x, y] = WHITE
+    def _process_step_pixels(
+        self, prefix_all: int, prefix_any: int, next_bits: int
+    ) -> Image.Image:
+        """マスク合成で段階画像を生成（先頭からの共通部分・和集合と次の文字）"""
+        # 優先度の低い色から順に塗り重ねる
+        frame = self._new_palette_image()
+        frame.paste(PALETTE_INDEX[RED_SOFT], mask=self._unpack_mask(prefix_any))
+        frame.paste(PALETTE_INDEX[BLUE], mask=self._unpack_mask(next_bits))
+        frame.paste(PALETTE_INDEX[RED], mask=self._unpack_mask(prefix_all))
+        frame.paste(
+            PALETTE_INDEX[PURPLE], mask=self._unpack_mask(prefix_all & next_bits)
+        )
 
         return frame
 
@@ -274,15 +307,12 @@ class ImageGenerator:
         normalized_font_key = self.normalize_font_key(font_key)
         logger.info(f"画像生成開始: {word}, font_key: {normalized_font_key}")
 
-        # フォント選択
-        font = self._get_font_for_key(normalized_font_key)
-
-        # 漢字画像作成
-        kanji1 = self._create_kanji_image(word[0], font)
-        kanji2 = self._create_kanji_image(word[1], font)
+        # 文字マスク取得
+        mask1 = self._get_kanji_mask(word[0], normalized_font_key)
+        mask2 = self._get_kanji_mask(word[1], normalized_font_key)
 
         # 画像処理
-        q_image, a_image = self._process_pixels(kanji1, kanji2)
+        q_image, a_image = self._process_pixels(mask1, mask2)
 
         # ファイル名生成
         suffix = "" if normalized_font_key == "default" else f"_{normalized_font_key}"
@@ -293,8 +323,8 @@ class ImageGenerator:
         a_path = os.path.join(self.images_dir, a_filename)
 
         # 画像保存
-        q_image.save(q_path)
-        a_image.save(a_path)
+        q_image.save(q_path, compress_level=PNG_COMPRESS_LEVEL)
+        a_image.save(a_path, compress_level=PNG_COMPRESS_LEVEL)
 
         logger.info(f"画像保存完了: {q_filename}, {a_filename}")
 
@@ -308,16 +338,15 @@ class ImageGenerator:
         normalized_font_key = self.normalize_font_key(font_key)
         logger.info(f"画像生成開始(和集合): {word}, font_key: {normalized_font_key}")
 
-        font = self._get_font_for_key(normalized_font_key)
-        kanji_images = [self._create_kanji_image(char, font) for char in word]
+        masks = [self._get_kanji_mask(char, normalized_font_key) for char in word]
 
         a_image = None
         if len(word) == 2:
-            q_image, a_image = self._process_pixels(kanji_images[0], kanji_images[1])
-            u_image = self._process_union_pixels(kanji_images[0], kanji_images[1])
+            q_image, a_image = self._process_pixels(masks[0], masks[1])
+            u_image = self._process_union_pixels(masks[0], masks[1])
         else:
-            q_image = self._process_intersection_pixels(kanji_images)
-            u_image = self._process_union_pixels_multi(kanji_images)
+            q_image = self._process_intersection_pixels(masks)
+            u_image = self._process_union_pixels_multi(masks)
 
         suffix = "" if normalized_font_key == "default" else f"_{normalized_font_key}"
         q_filename = f"Q_{word}{suffix}.png"
@@ -328,10 +357,10 @@ class ImageGenerator:
         a_path = os.path.join(self.images_dir, a_filename)
         u_path = os.path.join(self.images_dir, u_filename)
 
-        q_image.save(q_path)
+        q_image.save(q_path, compress_level=PNG_COMPRESS_LEVEL)
         if a_image is not None:
-            a_image.save(a_path)
-        u_image.save(u_path)
+            a_image.save(a_path, compress_level=PNG_COMPRESS_LEVEL)
+        u_image.save(u_path, compress_level=PNG_COMPRESS_LEVEL)
 
         if a_image is not None:
             logger.info(f"画像保存完了: {q_filename}, {a_filename}, {u_filename}")
@@ -350,72 +379,97 @@ class ImageGenerator:
         normalized_font_key = self.normalize_font_key(font_key)
         logger.info(f"動画生成開始: {word}, font_key: {normalized_font_key}")
 
-        font = self._get_font_for_key(normalized_font_key)
-        kanji_images = [self._create_kanji_image(char, font) for char in word]
-
-        temp_dir = tempfile.mkdtemp(prefix="frames_", dir=self.images_dir)
-        frame_paths = []
-        try:
-            for idx in range(1, len(word)):
-                frame = self._process_step_pixels(kanji_images, idx)
-                frame_name = f"frame_{idx:03d}.png"
-                frame_path = os.path.join(temp_dir, frame_name)
-                frame.save(frame_path)
-                frame_paths.append(frame_path)
-
-            intersection_frame = self._process_intersection_pixels(kanji_images)
-            intersection_index = len(word)
-            intersection_name = f"frame_{intersection_index:03d}.png"
-            intersection_path = os.path.join(temp_dir, intersection_name)
-            intersection_frame.save(intersection_path)
-            frame_paths.append(intersection_path)
-
-            suffix = (
-                "" if normalized_font_key == "default" else f"_{normalized_font_key}"
-            )
-            video_filename = f"V_{word}{suffix}.mp4"
-            preview_filename = f"P_{word}{suffix}.png"
-            video_path = os.path.join(self.images_dir, video_filename)
-            preview_path = os.path.join(self.images_dir, preview_filename)
-
-            if frame_paths:
-                shutil.copyfile(frame_paths[0], preview_path)
+        masks = [self._get_kanji_mask(char, normalized_font_key) for char in word]
 
-            self._build_video_from_frames(temp_dir, fps, video_path)
-            logger.info(f"動画保存完了: {video_filename}")
-            return video_path, preview_path
-        finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        suffix = "" if normalized_font_key == "default" else f"_{normalized_font_key}"
+        video_filename = f"V_{word}{suffix}.mp4"
+        preview_filename = f"P_{word}{suffix}.png"
+        video_path = os.path.join(self.images_dir, video_filename)
+        preview_path = os.path.join(self.images_dir, preview_filename)
+
+        frames = self._iter_video_frames(masks)
+        first_frame = next(frames)
+        first_frame.save(preview_path, compress_level=PNG_COMPRESS_LEVEL)
+
+        self._build_video_from_frames(chain([first_frame], frames), fps, video_path)
+        logger.info(f"動画保存完了: {video_filename}")
+        return video_path, preview_path
+
+    def _iter_video_frames(self, masks: list) -> Iterator[Image.Image]:
+        """動画フレーム（段階画像と最後の共通部分画像）を順に生成"""
+        # 先頭からの共通部分・和集合は1文字ずつ積み上げて使い回す
+        # 動画生成はハンドラのスレッドで動くため、ここでは並列化せず1枚ずつ描く
+        prefix_all = prefix_any = masks[0]
+        for next_bits in masks[1:]:
+            yield self._process_step_pixels(prefix_all, prefix_any, next_bits)
+            prefix_all &= next_bits
+            prefix_any |= next_bits
+        yield self._process_intersection_pixels([prefix_all])
+
+    def _frame_to_yuv420p(self, frame: Image.Image) -> bytes:
+        """パレット画像のフレームをyuv420pの生データ（Y, U, Vの順）に変換"""
+        width, height = frame.size
+        # 色差は縦横1/2に間引く（色番号のまま最近傍で縮小して表を引く）
+        chroma = frame.resize(((width + 1) // 2, (height + 1) // 2), Image.NEAREST)
+        return (
+            frame.point(Y_INDEX_LUT).tobytes()
+            + chroma.point(U_INDEX_LUT).tobytes()
+            + chroma.point(V_INDEX_LUT).tobytes()
+        )
 
     def _build_video_from_frames(
-        self, frame_dir: str, fps: int, output_path: str
+        self, frames: Iterable[Image.Image], fps: int, output_path: str
     ) -> None:
-        """ffmpegでフレーム画像を動画に変換"""
-        pattern = os.path.join(frame_dir, "frame_%03d.png")
+        """パレット画像のフレームをyuv420pでffmpegの標準入力に流して動画に変換"""
+        width, height = self.background_size
         cmd = [
             "ffmpeg",
             "-y",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "yuv420p",
+            "-s",
+            f"{width}x{height}",
             "-framerate",
             str(fps),
             "-i",
-            pattern,
+            "-",
             "-c:v",
             "libx264",
             "-pix_fmt",
             "yuv420p",
             output_path,
         ]
-        try:
-            subprocess.run(
+        # stderrをパイプにすると出力が溜まった時に書き込みが詰まるため一時ファイルで受ける
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
                 cmd,
-                check=True,
+                stdin=subprocess.PIPE,
                 stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-                text=True,
+                stderr=stderr_file,
+                bufsize=0,
             )
-        except subprocess.CalledProcessError as exc:
-            logger.error("ffmpeg error: %s", exc.stderr)
-            raise
+            try:
+                try:
+                    for frame in frames:
+                        process.stdin.write(self._frame_to_yuv420p(frame))
+                finally:
+                    process.stdin.close()
+            except BrokenPipeError:
+                # ffmpegが先に終了した場合は終了コードで判定する
+                pass
+            except Exception:
+                process.kill()
+                process.wait()
+                raise
+
+            returncode = process.wait()
+            if returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode("utf-8", errors="replace")
+                logger.error("ffmpeg error: %s", stderr)
+                raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
 
 
 # Flask アプリケーションのルート定義
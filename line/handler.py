@@ -1,17 +1,129 @@
 import json
+import queue
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from line.image_store import BaseImageStore
 from line.parser import LineCommandParser
 from line.profile import LineProfileClient
 from line.reply import LineReplyClient
-from line.signature import verify_signature
+from line.signature import SIGNATURE_LENGTH, verify_signature
 from typing import Callable, Dict, Optional
 
+# LINE webhook payloads are a few KB; anything far larger is rejected before HMAC.
+MAX_WEBHOOK_BODY_BYTES = 1024 * 1024
+# Worker threads for overlapping image generation, uploads and cleanup.
+IO_POOL_WORKERS = 4
+# Worker threads for handling events from different sources in one webhook.
+EVENT_POOL_WORKERS = 8
+# Webhooks waiting to be handled when events are processed after the 200 response.
+EVENT_QUEUE_SIZE = 256
+EVENT_QUEUE_WORKERS = 4
+# Group text after the bot mention: "答え <n>" releases the answer to quiz n.
+ANSWER_RELEASE_RE = re.compile(r"答え(?:\s*(\d+)$)?")
+QUIZ_NUMBER_RE = re.compile(r"\d+")
+# "(number).(word)" quiz entry; the number group is None when it is not numeric.
+QUIZ_ENTRY_RE = re.compile(r"\s*(?:(\d+)|[^.]*?)\s*\.\s*(.*?)\s*", re.DOTALL)
+# Quiz list word: "word(mode label) @prompt", both suffixes optional.
+QUIZ_WORD_RE = re.compile(r"^(.*?)(?:\(([^()]*)\))?(?:\s*@(.+))?$")
+# Event source types handled as group conversations.
+GROUP_SOURCE_TYPES = frozenset({"group", "room"})
+# Commands that reply with the quiz list.
+QUIZ_LIST_COMMANDS = frozenset({"menu_list", "list"})
+# Users whose rendered quiz list is kept between requests.
+QUIZ_LIST_CACHE_SIZE = 256
+# Quiz slots a user can register.
+QUIZ_NUMBERS = range(1, 11)
+QUIZ_NUMBER_SET = frozenset(QUIZ_NUMBERS)
+# Plain ASCII quiz numbers, resolved without int().
+QUIZ_NUMBER_TEXTS = {str(number): number for number in QUIZ_NUMBERS}
+# Start of the dispatch hint line, skipped when a quiz list is sent back.
+QUIZ_LIST_DISPATCH_PREFIX = "グループで「@"
+
+
+def _escape_format(text: str) -> str:
+    """Escape braces so text can be embedded in a str.format template."""
+    return text.replace("{", "{{").replace("}", "}}")
+
 
 class LineHandler:
     """Handle LINE webhook events and reply with generated content."""
 
+    # Fixed attribute set: slot access is cheaper than the instance __dict__.
+    __slots__ = (
+        "channel_secret",
+        "_channel_secret_bytes",
+        "generator",
+        "settings_store",
+        "logger",
+        "texts",
+        "keywords",
+        "quick_reply_builder",
+        "settings_quick_reply_builder",
+        "mode_quick_reply_builder",
+        "font_quick_reply_builder",
+        "default_font_key",
+        "image_store",
+        "quiz_store",
+        "bot_user_id",
+        "parser",
+        "reply_client",
+        "profile_client",
+        "_t_welcome",
+        "_t_save_failed",
+        "_t_invalid_word",
+        "_t_not_two_chars",
+        "_t_need_word",
+        "_t_invalid_number",
+        "_t_bulk_update_success",
+        "_t_bulk_update_failed",
+        "_t_quiz_prompt_help",
+        "_t_error_prefix",
+        "_t_quiz_prompt_set_fmt",
+        "_t_settings_updated_fmt",
+        "_t_font_set_fmt",
+        "_t_synth_result_fmt",
+        "_t_answer_release_format",
+        "_t_quiz_format",
+        "_t_answer_format",
+        "_t_generate_failed",
+        "_t_mention_fallback",
+        "_t_answer_correct",
+        "_t_answer_incorrect",
+        "_t_answer_template_fmt",
+        "_t_unregistered_fmt",
+        "_t_quiz_answer_fmt",
+        "_t_quiz_dispatch_fmt",
+        "_t_quiz_unset",
+        "_t_quiz_list_title",
+        "_t_quiz_list_footer",
+        "_quiz_list_template",
+        "_quiz_list_unset_entries",
+        "_menu_text_commands",
+        "_menu_mode_commands",
+        "_event_commands",
+        "_io_pool",
+        "_event_pool",
+        "_event_queue",
+        "_quiz_list_cache",
+        "_quiz_list_cache_lock",
+        "_settings_cache",
+        "_settings_lock",
+        "_request_state",
+        "_invalid_signature_response",
+        "_bad_request_response",
+    )
+
+    # Webhook responses; the failure bodies come from texts and are set at init.
+    _OK_RESPONSE = ("OK", 200)
+
+    # Message payload templates; each reply copies one and fills in its fields.
+    _TEXT_TEMPLATE = {"type": "text", "text": ""}
+    _IMAGE_TEMPLATE = {"type": "image", "originalContentUrl": "", "previewImageUrl": ""}
+    _VIDEO_TEMPLATE = {"type": "video", "originalContentUrl": "", "previewImageUrl": ""}
+
     def __init__(
         self,
         *,
@@ -34,9 +146,12 @@ class LineHandler:
         profile_client: Optional[LineProfileClient] = None,
         parser: Optional[LineCommandParser] = None,
         reply_client: Optional[LineReplyClient] = None,
+        http_session=None,
+        async_events: bool = False,
     ) -> None:
         """Initialize LINE handler dependencies and configuration."""
         self.channel_secret = channel_secret
+        self._channel_secret_bytes = channel_secret.encode("utf-8")
         self.generator = generator
         self.settings_store = settings_store
         self.logger = logger
@@ -57,31 +172,259 @@ class LineHandler:
         self.bot_user_id = bot_user_id
         self.parser = parser or LineCommandParser(keywords)
         self.reply_client = reply_client or LineReplyClient(
-            channel_access_token, logger
+            channel_access_token, logger, http_session
         )
         self.profile_client = profile_client or LineProfileClient(
-            channel_access_token, logger
+            channel_access_token, logger, http_session
+        )
+        # Texts are fixed after construction, so resolve the common ones once.
+        self._invalid_signature_response = (
+            texts.get("invalid_signature", "Invalid signature"),
+            403,
         )
+        self._bad_request_response = (texts.get("bad_request", "Bad Request"), 400)
+        self._t_welcome = texts.get("welcome_prefix", "") + texts.get("usage", "")
+        self._t_save_failed = texts.get("save_failed", "")
+        self._t_invalid_word = texts.get("invalid_word", "")
+        self._t_not_two_chars = texts.get("not_two_chars", "")
+        self._t_need_word = texts.get("need_word", "")
+        self._t_invalid_number = texts.get("invalid_number", "")
+        self._t_bulk_update_success = texts.get("bulk_update_success", "")
+        self._t_bulk_update_failed = texts.get("bulk_update_failed", "")
+        self._t_quiz_prompt_help = texts.get("quiz_prompt_help", "")
+        self._t_error_prefix = texts.get("error_prefix", "")
+        self._t_quiz_prompt_set_fmt = texts.get("quiz_prompt_set", "").format
+        self._t_settings_updated_fmt = texts.get("settings_updated", "").format
+        self._t_font_set_fmt = texts.get("font_set", "").format
+        self._t_synth_result_fmt = texts.get(
+            "synth_result", "「{word}」の合成結果です。"
+        ).format
+
+        # Group quiz texts, with their fallbacks built once.
+        bot_name = texts.get("bot_name", "文字合成ボット")
+        self._t_answer_release_format = texts.get(
+            "answer_release_format",
+            f"解答発表は「@{bot_name} 答え (問題番号)」と送ってください。",
+        )
+        quiz_format = texts.get("quiz_format", f"@{bot_name} (問題番号)")
+        self._t_quiz_format = f"出題時は「{quiz_format}」と送ってください。"
+        self._t_answer_format = texts.get(
+            "answer_format",
+            "解答は以下のフォーマットで送信してください。\n@出題者へのメンション (問題番号).(解答)",
+        )
+        self._t_generate_failed = self._t_error_prefix + texts.get(
+            "generate_failed", "画像の生成に失敗しました。"
+        )
+        self._t_mention_fallback = texts.get("mention_fallback", "ユーザー")
+        self._t_answer_correct = texts.get("answer_correct", "正解")
+        self._t_answer_incorrect = texts.get("answer_incorrect", "不正解")
+        self._t_answer_template_fmt = texts.get(
+            "answer_template", "{name}さん、{result}です。"
+        ).format
+        self._t_unregistered_fmt = texts.get(
+            "unregistered_template", "{number}問目は未登録です。"
+        ).format
+        self._t_quiz_answer_fmt = texts.get(
+            "quiz_answer_template",
+            "【解答フォーマット】\n@{name} {number}.(解答)",
+        ).format
+
+        # Quiz registration and quiz list texts.
+        self._t_quiz_dispatch_fmt = texts.get(
+            "quiz_dispatch_template",
+            f"グループで「@{bot_name} {{number}}」と送ると出題されます。",
+        ).format
+        self._t_quiz_unset = texts.get("quiz_unset", "未設定")
+        self._t_quiz_list_title = texts.get("quiz_list_title", "【問題一覧】")
+        self._t_quiz_list_footer = texts.get("quiz_list_footer") or texts.get(
+            "quiz_dispatch_list",
+            f"グループで「@{bot_name} (問題番号)」と送ると出題されます。",
+        )
+        # Title, one "n. {qn}" line per quiz number and the footer; filled with
+        # format_map from a copy of the all-unset entries.
+        self._quiz_list_template = "\n".join(
+            [_escape_format(self._t_quiz_list_title)]
+            + [f"{number}. {{q{number}}}" for number in QUIZ_NUMBERS]
+            + [_escape_format(self._t_quiz_list_footer)]
+        )
+        self._quiz_list_unset_entries = {
+            f"q{number}": self._t_quiz_unset for number in QUIZ_NUMBERS
+        }
+
+        # Menu commands answered with a fixed text:
+        # type -> (text, include default quick reply, extra quick reply builder)
+        self._menu_text_commands = {
+            "help": (texts.get("usage", ""), True, None),
+            "menu_generate": (texts.get("generate_prompt", ""), False, None),
+            "menu_register": (texts.get("register_help", ""), False, None),
+            "menu_settings": (
+                texts.get("settings_prompt", ""),
+                False,
+                settings_quick_reply_builder,
+            ),
+            "menu_prompt": (self._t_quiz_prompt_help, False, None),
+            "menu_mode": (
+                texts.get("mode_prompt", ""),
+                False,
+                mode_quick_reply_builder,
+            ),
+            "menu_font": (
+                texts.get("font_prompt", ""),
+                False,
+                font_quick_reply_builder,
+            ),
+            "menu_usage": (texts.get("usage", ""), False, None),
+            "invalid_word": (self._t_invalid_word, False, None),
+        }
+        # Quiz mode switches: type -> (stored quiz_mode, text)
+        self._menu_mode_commands = {
+            "mode_common": ("intersection", texts.get("mode_set_common", "")),
+            "mode_union": ("union", texts.get("mode_set_union", "")),
+        }
+        # Commands handled once the text is known not to be a quiz registration:
+        # type -> handler(command, user_key, user_settings, font_key, reply_token)
+        self._event_commands = {
+            "both": self._handle_both_command,
+            "setting": self._handle_setting_command,
+        }
+        self._io_pool = ThreadPoolExecutor(max_workers=IO_POOL_WORKERS)
+        self._event_pool = ThreadPoolExecutor(max_workers=EVENT_POOL_WORKERS)
+        # user_key -> (quiz store version, rendered quiz list text), oldest first
+        self._quiz_list_cache = OrderedDict()
+        self._quiz_list_cache_lock = threading.Lock()
+        # Stored settings, loaded on first use and kept in step with every save.
+        self._settings_cache: Optional[dict] = None
+        # Serializes the first load and every write of the shared settings dict;
+        # reentrant because a save loads the settings while holding it.
+        self._settings_lock = threading.RLock()
+        # Per-thread state for the webhook request being handled.
+        self._request_state = threading.local()
+        # With async_events, webhooks are acknowledged right away and their
+        # events are handled by background workers.
+        self._event_queue: Optional[queue.Queue] = None
+        if async_events:
+            self._event_queue = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
+            for _ in range(EVENT_QUEUE_WORKERS):
+                threading.Thread(target=self._run_event_queue, daemon=True).start()
 
     def handle_callback(self, body: bytes, signature: str) -> tuple:
         """Validate signature and process webhook payload."""
-        if not verify_signature(self.channel_secret, body, signature):
-            return self.texts.get("invalid_signature", "Invalid signature"), 403
+        # Reject requests that cannot be valid without hashing the body.
+        if not signature:
+            return self._invalid_signature_response
+        if len(body) > MAX_WEBHOOK_BODY_BYTES:
+            return self._bad_request_response
+        if len(signature) != SIGNATURE_LENGTH:
+            return self._invalid_signature_response
+        if not verify_signature(self._channel_secret_bytes, body, signature):
+            return self._invalid_signature_response
 
+        # A webhook body is a JSON object; anything else cannot be parsed.
+        if not body.lstrip().startswith(b"{"):
+            self.logger.warning("LINE webhook decode error: body is not a JSON object")
+            return self._bad_request_response
         try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as exc:
-            self.logger.error("LINE webhook decode error: %s", exc)
-            return self.texts.get("bad_request", "Bad Request"), 400
+            payload = json.loads(body)
+        except ValueError as exc:
+            self.logger.warning("LINE webhook decode error: %s", exc)
+            return self._bad_request_response
+
+        events = payload.get("events")
+        if not events:
+            return self._OK_RESPONSE
+        if self._event_queue is not None:
+            try:
+                self._event_queue.put_nowait(events)
+            except queue.Full:
+                self.logger.error(
+                    "LINE event queue is full; dropped %d events", len(events)
+                )
+            return self._OK_RESPONSE
+        self._process_events(events)
+        return self._OK_RESPONSE
+
+    def _run_event_queue(self) -> None:
+        """Handle queued webhook events on a background worker thread."""
+        while True:
+            events = self._event_queue.get()
+            try:
+                self._process_events(events)
+            except Exception as exc:
+                self.logger.error("LINE event handling error: %s", exc)
+            finally:
+                self._event_queue.task_done()
+
+    def _process_events(self, events: list) -> None:
+        """Handle the events of one webhook request."""
+        if len(events) > 1:
+            try:
+                self._handle_events_concurrently(events)
+            finally:
+                self._request_state.replies = None
+        else:
+            for event in events:
+                self._handle_event(event)
 
-        events = payload.get("events", [])
+    def _handle_events_concurrently(self, events: list) -> None:
+        """Handle each source's events in parallel, keeping per-source order."""
+        # Replies are posted in the background, in order within each source, and
+        # awaited once every event ran.
+        events_by_source: Dict[str, list] = {}
         for event in events:
-            self._handle_event(event)
+            events_by_source.setdefault(self._get_user_key(event), []).append(event)
+        source_replies = [[] for _ in events_by_source]
+        if len(events_by_source) == 1:
+            self._request_state.replies = source_replies[0]
+            handle_event = self._handle_event
+            for event in events:
+                handle_event(event)
+        else:
+            futures = [
+                self._event_pool.submit(
+                    self._handle_source_events, source_events, replies
+                )
+                for source_events, replies in zip(
+                    events_by_source.values(), source_replies
+                )
+            ]
+            for future in futures:
+                future.result()
+        for replies in source_replies:
+            for reply in replies:
+                reply.result()
 
-        return "OK", 200
+    def _handle_source_events(self, events: list, replies: list) -> None:
+        """Handle one source's events on an event worker thread."""
+        state = self._request_state
+        state.replies = replies
+        handle_event = self._handle_event
+        try:
+            for event in events:
+                handle_event(event)
+        finally:
+            state.replies = None
 
     def _reply(self, reply_token: str, messages: list) -> bool:
-        """Send reply messages via LINE Messaging API."""
+        """Send reply messages via LINE Messaging API.
+
+        While a multi-event webhook is handled, the reply is only queued behind
+        the source's earlier replies, and True means it was queued, not sent.
+        """
+        replies = getattr(self._request_state, "replies", None)
+        if replies is not None:
+            previous = replies[-1] if replies else None
+            replies.append(
+                self._io_pool.submit(
+                    self._post_reply_after, previous, reply_token, messages
+                )
+            )
+            return True
+        return self.reply_client.reply(reply_token, messages)
+
+    def _post_reply_after(self, previous, reply_token: str, messages: list) -> bool:
+        """Post a queued reply once the source's previous reply has been sent."""
+        if previous is not None:
+            wait([previous])
         return self.reply_client.reply(reply_token, messages)
 
     def _handle_event(self, event: dict) -> None:
@@ -92,8 +435,7 @@ class LineHandler:
             return
 
         if event_type == "follow":
-            welcome = self.texts.get("welcome_prefix", "") + self.texts.get("usage", "")
-            message = self._text_message(welcome, include_quick_reply=True)
+            message = self._text_message(self._t_welcome, include_quick_reply=True)
             self._reply(reply_token, [message])
             return
 
@@ -103,14 +445,16 @@ class LineHandler:
         message = event.get("message", {})
         if message.get("type") != "text":
             return
+        text = message.get("text", "")
+        if not text:
+            return
 
         user_key = self._get_user_key(event)
         source_type = event.get("source", {}).get("type")
         user_settings = self._get_user_settings(user_key)
         font_key = user_settings.get("font", self.default_font_key)
 
-        text = message.get("text", "")
-        if source_type in ("group", "room"):
+        if source_type in GROUP_SOURCE_TYPES:
             self._handle_group_message(
                 event, message, user_key, font_key, text, reply_token
             )
@@ -119,249 +463,137 @@ class LineHandler:
         bulk_updates = self._parse_bulk_quiz_list(text)
         if bulk_updates is not None:
             if not self._apply_bulk_quiz_update(user_key, bulk_updates):
-                msg = self._text_message(self.texts.get("bulk_update_failed", ""))
+                msg = self._text_message(self._t_bulk_update_failed)
                 self._reply(reply_token, [msg])
                 return
-            msg = self._text_message(self.texts.get("bulk_update_success", ""))
+            msg = self._text_message(self._t_bulk_update_success)
             self._reply(reply_token, [msg])
             return
 
         command = self.parser.parse(text)
-        if text.startswith("font_"):
-            value = text[len("font_") :].strip()
+        font_value = text.removeprefix("font_")
+        if font_value != text:
+            value = font_value.strip()
             if value:
                 command = {"type": "font", "value": value}
         if self._handle_menu_commands(command, user_key, source_type, reply_token):
             return
-        if command["type"] == "quiz_prompt":
-            value = command.get("value", "")
-            if not value:
-                msg = self._text_message(self.texts.get("quiz_prompt_help", ""))
-                self._reply(reply_token, [msg])
-                return
-            if "@" in value:
-                msg = self._text_message(
-                    self.texts.get(
-                        "quiz_prompt_invalid_char", "問題文に@は使用できません。"
-                    )
-                )
-                self._reply(reply_token, [msg])
-                return
-            if len(value) > 20:
-                msg = self._text_message(
-                    self.texts.get("quiz_prompt_too_long", "問題文は20文字以内で指定してください。")
-                )
-                self._reply(reply_token, [msg])
-                return
-            user_settings["quiz_prompt"] = value
-            if not self._save_user_settings(user_key, user_settings):
-                self._reply(
-                    reply_token,
-                    [self._text_message(self.texts.get("save_failed", ""))],
-                )
-                return
-            msg = self._text_message(
-                self.texts.get("quiz_prompt_set", "").format(prompt=value)
+        command_type = command["type"]
+        if command_type == "quiz_prompt":
+            self._handle_quiz_prompt_command(
+                command, user_key, user_settings, reply_token
             )
-            self._reply(reply_token, [msg])
             return
         if self._handle_user_quiz_registration(text, user_key, reply_token):
             return
-        if command["type"] == "both":
-            self._handle_user_quiz_images(command, font_key, reply_token)
+        handle_command = self._event_commands.get(command_type)
+        if handle_command is not None:
+            handle_command(command, user_key, user_settings, font_key, reply_token)
             return
 
-        if command["type"] == "setting":
-            setting = command["setting"]
-            if "font" in setting:
-                try:
-                    font_key = self._normalize_font_key(setting["font"])
-                except ValueError as exc:
-                    self._reply(reply_token, [self._text_message(str(exc))])
-                    return
-                user_settings["font"] = font_key
-            if not self._save_user_settings(user_key, user_settings):
-                self._reply(
-                    reply_token,
-                    [self._text_message(self.texts.get("save_failed", ""))],
+        msg = self._text_message(self._t_not_two_chars)
+        self._reply(reply_token, [msg])
+
+    def _handle_quiz_prompt_command(
+        self, command: dict, user_key: str, user_settings: dict, reply_token: str
+    ) -> None:
+        value = command.get("value", "")
+        if not value:
+            msg = self._text_message(self._t_quiz_prompt_help)
+            self._reply(reply_token, [msg])
+            return
+        if "@" in value:
+            msg = self._text_message(
+                self.texts.get(
+                    "quiz_prompt_invalid_char", "問題文に@は使用できません。"
                 )
-                return
-            summary = self._build_settings_summary(user_settings)
+            )
+            self._reply(reply_token, [msg])
+            return
+        if len(value) > 20:
             msg = self._text_message(
-                self.texts.get("settings_updated", "").format(settings=user_settings)
-                + "\n"
-                + summary,
-                include_quick_reply=True,
+                self.texts.get("quiz_prompt_too_long", "問題文は20文字以内で指定してください。")
             )
             self._reply(reply_token, [msg])
             return
+        user_settings["quiz_prompt"] = value
+        if not self._save_user_settings(user_key, user_settings):
+            self._reply(
+                reply_token,
+                [self._text_message(self._t_save_failed)],
+            )
+            return
+        msg = self._text_message(self._t_quiz_prompt_set_fmt(prompt=value))
+        self._reply(reply_token, [msg])
 
-        if command["type"] == "font":
+    def _handle_setting_command(
+        self,
+        command: dict,
+        user_key: str,
+        user_settings: dict,
+        font_key: str,
+        reply_token: str,
+    ) -> None:
+        setting = command["setting"]
+        if "font" in setting:
             try:
-                font_key = self._normalize_font_key(command["value"])
+                font_key = self._normalize_font_key(setting["font"])
             except ValueError as exc:
                 self._reply(reply_token, [self._text_message(str(exc))])
                 return
             user_settings["font"] = font_key
-            if not self._save_user_settings(user_key, user_settings):
-                self._reply(
-                    reply_token,
-                    [self._text_message(self.texts.get("save_failed", ""))],
-                )
-                return
-            msg = self._text_message(
-                self.texts.get("font_set", "").format(font=font_key),
-                include_quick_reply=True,
+        if not self._save_user_settings(user_key, user_settings):
+            self._reply(
+                reply_token,
+                [self._text_message(self._t_save_failed)],
             )
-            self._reply(reply_token, [msg])
-            return
-
-        if command["type"] == "both":
-            word = command.get("word", "")
-            if not word:
-                self._reply(
-                    reply_token, [self._text_message(self.texts.get("need_word", ""))]
-                )
-                return
-            if len(word) >= 2 and not self.parser._is_allowed_word(word):
-                msg = self._text_message(self.texts.get("invalid_word", ""))
-                self._reply(reply_token, [msg])
-                return
-            try:
-                messages = []
-                synth_result = self.texts.get("synth_result", "「{word}」の合成結果です。")
-                messages.append(
-                    self._text_message(synth_result.format(word=word))
-                )
-                if len(word) >= 3:
-                    q_path, a_path, u_path = self.generator.generate_images_with_union(
-                        word, font_key
-                    )
-                    q_url = self.image_store.get_image_url("q", word, font_key, q_path)
-                    u_url = self.image_store.get_image_url("u", word, font_key, u_path)
-                    messages.append(self._image_message(q_url))
-                    messages.append(self._image_message(u_url))
-
-                    video_path, preview_path = self.generator.generate_union_video(
-                        word, font_key, fps=1
-                    )
-                    video_url = self.image_store.get_video_url(
-                        "v", word, font_key, video_path
-                    )
-                    preview_url = self.image_store.get_image_url(
-                        "p", word, font_key, preview_path
-                    )
-                    messages.append(
-                        {
-                            "type": "video",
-                            "originalContentUrl": video_url,
-                            "previewImageUrl": preview_url,
-                        }
-                    )
-                    self._reply(reply_token, messages)
-                    self.image_store.cleanup(
-                        [q_path, a_path, u_path, video_path, preview_path]
-                    )
-                else:
-                    q_path, a_path, u_path = self.generator.generate_images_with_union(
-                        word, font_key
-                    )
-                    q_url = self.image_store.get_image_url("q", word, font_key, q_path)
-                    u_url = self.image_store.get_image_url("u", word, font_key, u_path)
-                    messages.append(self._image_message(q_url))
-                    messages.append(self._image_message(u_url))
-                    if a_path:
-                        a_url = self.image_store.get_image_url(
-                            "a", word, font_key, a_path
-                        )
-                        messages.append(self._image_message(a_url))
-                    self._reply(reply_token, messages)
-                    self.image_store.cleanup([q_path, a_path, u_path])
-            except Exception as exc:
-                self.logger.error("LINE image generate error: %s", exc)
-                err = f"{self.texts.get('error_prefix', '')}{exc}"
-                self._reply(reply_token, [self._text_message(err)])
             return
-
-        msg = self._text_message(self.texts.get("not_two_chars", ""))
+        summary = self._build_settings_summary(user_settings)
+        msg = self._text_message(
+            self._t_settings_updated_fmt(settings=user_settings) + "\n" + summary,
+            include_quick_reply=True,
+        )
         self._reply(reply_token, [msg])
 
+    def _handle_both_command(
+        self,
+        command: dict,
+        user_key: str,
+        user_settings: dict,
+        font_key: str,
+        reply_token: str,
+    ) -> None:
+        self._handle_user_quiz_images(command, font_key, reply_token)
+
     def _handle_menu_commands(
         self, command: dict, user_key: str, source_type: str, reply_token: str
     ) -> bool:
-        if command["type"] == "help":
-            msg = self._text_message(self.texts.get("usage", ""), True)
-            self._reply(reply_token, [msg])
-            return True
-        if command["type"] == "menu_generate":
-            msg = self._text_message(self.texts.get("generate_prompt", ""))
-            self._reply(reply_token, [msg])
-            return True
-        if command["type"] == "menu_register":
-            msg = self._text_message(self.texts.get("register_help", ""))
-            self._reply(reply_token, [msg])
-            return True
-        if command["type"] == "menu_list":
-            if source_type == "user":
-                msg = self._text_message(self._build_quiz_list_text(user_key))
-                self._reply(reply_token, [msg])
-            return True
-        if command["type"] == "menu_settings":
-            message = self._text_message(self.texts.get("settings_prompt", ""))
-            if self.settings_quick_reply_builder:
-                settings_quick = self.settings_quick_reply_builder()
-                if settings_quick:
-                    message["quickReply"] = settings_quick
-            self._reply(reply_token, [message])
-            return True
-        if command["type"] == "menu_prompt":
-            message = self._text_message(self.texts.get("quiz_prompt_help", ""))
-            self._reply(reply_token, [message])
-            return True
-        if command["type"] == "menu_mode":
-            message = self._text_message(self.texts.get("mode_prompt", ""))
-            if self.mode_quick_reply_builder:
-                mode_quick = self.mode_quick_reply_builder()
-                if mode_quick:
-                    message["quickReply"] = mode_quick
+        command_type = command["type"]
+        text_command = self._menu_text_commands.get(command_type)
+        if text_command is not None:
+            text, include_quick_reply, quick_reply_builder = text_command
+            message = self._text_message(text, include_quick_reply)
+            if quick_reply_builder:
+                quick_reply = quick_reply_builder()
+                if quick_reply:
+                    message["quickReply"] = quick_reply
             self._reply(reply_token, [message])
             return True
-        if command["type"] == "menu_font":
-            message = self._text_message(self.texts.get("font_prompt", ""))
-            if self.font_quick_reply_builder:
-                font_quick = self.font_quick_reply_builder()
-                if font_quick:
-                    message["quickReply"] = font_quick
-            self._reply(reply_token, [message])
-            return True
-        if command["type"] == "mode_common":
-            user_settings = self._get_user_settings(user_key)
-            user_settings["quiz_mode"] = "intersection"
-            self._save_user_settings(user_key, user_settings)
-            msg = self._text_message(self.texts.get("mode_set_common", ""))
-            self._reply(reply_token, [msg])
-            return True
-        if command["type"] == "mode_union":
+        mode_command = self._menu_mode_commands.get(command_type)
+        if mode_command is not None:
+            quiz_mode, text = mode_command
             user_settings = self._get_user_settings(user_key)
-            user_settings["quiz_mode"] = "union"
+            user_settings["quiz_mode"] = quiz_mode
             self._save_user_settings(user_key, user_settings)
-            msg = self._text_message(self.texts.get("mode_set_union", ""))
+            msg = self._text_message(text)
             self._reply(reply_token, [msg])
             return True
-        if command["type"] == "menu_usage":
-            msg = self._text_message(self.texts.get("usage", ""))
-            self._reply(reply_token, [msg])
-            return True
-        if command["type"] == "invalid_word":
-            msg = self._text_message(self.texts.get("invalid_word", ""))
-            self._reply(reply_token, [msg])
-            return True
-        if command["type"] == "list":
+        if command_type in QUIZ_LIST_COMMANDS:
             if source_type == "user":
-                msg = self._text_message(self._build_quiz_list_text(user_key))
+                msg = self._text_message(self._get_quiz_list_text(user_key))
                 self._reply(reply_token, [msg])
             return True
-        if command["type"] == "font":
+        if command_type == "font":
             return self._handle_font_command(command, user_key, reply_token)
         return False
 
@@ -378,11 +610,11 @@ class LineHandler:
         if not self._save_user_settings(user_key, user_settings):
             self._reply(
                 reply_token,
-                [self._text_message(self.texts.get("save_failed", ""))],
+                [self._text_message(self._t_save_failed)],
             )
             return True
         msg = self._text_message(
-            self.texts.get("font_set", "").format(font=font_key),
+            self._t_font_set_fmt(font=font_key),
             include_quick_reply=True,
         )
         self._reply(reply_token, [msg])
@@ -396,15 +628,15 @@ class LineHandler:
             return False
         status, number, word = quiz_status
         if status == "invalid_number":
-            msg = self._text_message(self.texts.get("invalid_number", ""))
+            msg = self._text_message(self._t_invalid_number)
             self._reply(reply_token, [msg])
             return True
         if status == "invalid_length":
-            msg = self._text_message(self.texts.get("not_two_chars", ""))
+            msg = self._text_message(self._t_not_two_chars)
             self._reply(reply_token, [msg])
             return True
         if status == "invalid_word":
-            msg = self._text_message(self.texts.get("invalid_word", ""))
+            msg = self._text_message(self._t_invalid_word)
             self._reply(reply_token, [msg])
             return True
         if status == "ok":
@@ -428,64 +660,70 @@ class LineHandler:
     ) -> None:
         word = command.get("word", "")
         if not word:
-            self._reply(
-                reply_token, [self._text_message(self.texts.get("need_word", ""))]
-            )
+            self._reply(reply_token, [self._text_message(self._t_need_word)])
             return
-        if len(word) >= 2 and not self.parser._is_allowed_word(word):
-            msg = self._text_message(self.texts.get("invalid_word", ""))
+        word_len = len(word)
+        if word_len >= 2 and not self.parser._is_allowed_word(word):
+            msg = self._text_message(self._t_invalid_word)
             self._reply(reply_token, [msg])
             return
         try:
-            messages = []
-            messages.append(self._text_message(f"「{word}」の合成結果です。"))
-            if len(word) >= 3:
-                q_path, a_path, u_path = self.generator.generate_images_with_union(
-                    word, font_key
+            messages = [self._text_message(self._t_synth_result_fmt(word=word))]
+            q_path, a_path, u_path = self.generator.generate_images_with_union(
+                word, font_key
+            )
+            if word_len >= 3:
+                # Render the video while the still images are being uploaded.
+                video_future = self._io_pool.submit(
+                    self.generator.generate_union_video, word, font_key, fps=1
                 )
-                q_url = self.image_store.get_image_url("q", word, font_key, q_path)
-                u_url = self.image_store.get_image_url("u", word, font_key, u_path)
-                messages.append(self._image_message(q_url))
-                messages.append(self._image_message(u_url))
-
-                video_path, preview_path = self.generator.generate_union_video(
-                    word, font_key, fps=1
+                image_futures = self._submit_image_messages(
+                    word, font_key, [("q", q_path), ("u", u_path)]
                 )
-                video_url = self.image_store.get_video_url(
-                    "v", word, font_key, video_path
+                video_path, preview_path = video_future.result()
+                video_url_future = self._io_pool.submit(
+                    self.image_store.get_video_url, "v", word, font_key, video_path
                 )
                 preview_url = self.image_store.get_image_url(
                     "p", word, font_key, preview_path
                 )
+                messages.extend(future.result() for future in image_futures)
                 messages.append(
-                    {
-                        "type": "video",
-                        "originalContentUrl": video_url,
-                        "previewImageUrl": preview_url,
-                    }
+                    self._video_message(video_url_future.result(), preview_url)
                 )
                 self._reply(reply_token, messages)
-                self.image_store.cleanup(
-                    [q_path, a_path, u_path, video_path, preview_path]
+                self._io_pool.submit(
+                    self.image_store.cleanup,
+                    [q_path, a_path, u_path, video_path, preview_path],
                 )
             else:
-                q_path, a_path, u_path = self.generator.generate_images_with_union(
-                    word, font_key
-                )
-                q_url = self.image_store.get_image_url("q", word, font_key, q_path)
-                u_url = self.image_store.get_image_url("u", word, font_key, u_path)
-                messages.append(self._image_message(q_url))
-                messages.append(self._image_message(u_url))
+                images = [("q", q_path), ("u", u_path)]
                 if a_path:
-                    a_url = self.image_store.get_image_url("a", word, font_key, a_path)
-                    messages.append(self._image_message(a_url))
+                    images.append(("a", a_path))
+                image_futures = self._submit_image_messages(word, font_key, images)
+                messages.extend(future.result() for future in image_futures)
                 self._reply(reply_token, messages)
-                self.image_store.cleanup([q_path, a_path, u_path])
+                self._io_pool.submit(self.image_store.cleanup, [q_path, a_path, u_path])
         except Exception as exc:
             self.logger.error("LINE image generate error: %s", exc)
-            err = f"{self.texts.get('error_prefix', '')}{exc}"
+            err = f"{self._t_error_prefix}{exc}"
             self._reply(reply_token, [self._text_message(err)])
 
+    def _submit_image_messages(self, word: str, font_key: str, images: list) -> list:
+        """Start turning (kind, path) pairs into image messages in parallel."""
+        return [
+            self._io_pool.submit(self._build_image_message, kind, word, font_key, path)
+            for kind, path in images
+        ]
+
+    def _build_image_message(
+        self, kind: str, word: str, font_key: str, path: str
+    ) -> dict:
+        """Upload one image and build its message payload."""
+        return self._image_message(
+            self.image_store.get_image_url(kind, word, font_key, path)
+        )
+
     def _handle_group_message(
         self,
         event: dict,
@@ -495,10 +733,11 @@ class LineHandler:
         text: str,
         reply_token: str,
     ) -> None:
-        mentionees = message.get("mention", {}).get("mentionees", [])
+        mentionees = (message.get("mention") or {}).get("mentionees")
         if not mentionees:
             return
-        sender_id = event.get("source", {}).get("userId", "")
+        source = event.get("source") or {}
+        sender_id = source.get("userId", "")
         sender_key = f"user:{sender_id}" if sender_id else user_key
         remaining_text = self._strip_mention_text(text, mentionees).strip()
         tokens = remaining_text.split()
@@ -508,24 +747,17 @@ class LineHandler:
         command_text = " ".join(command_tokens).strip()
         last_token = tokens[-1] if tokens else ""
 
-        if self._is_bot_mentioned(message):
-            if command_text.startswith("答え"):
-                number = self._parse_answer_release_number(command_text)
+        if self._is_bot_mentioned(mentionees):
+            answer_release = ANSWER_RELEASE_RE.match(command_text)
+            if answer_release:
+                number = self._parse_quiz_number(answer_release.group(1))
                 if not number:
-                    answer_release_format = self.texts.get(
-                        "answer_release_format",
-                        f"解答発表は「@{self.texts.get('bot_name', '文字合成ボット')} "
-                        "答え (問題番号)」と送ってください。",
-                    )
-                    msg = self._text_message(answer_release_format)
+                    msg = self._text_message(self._t_answer_release_format)
                     self._reply(reply_token, [msg])
                     return
                 stored_word = self.quiz_store.get_word(sender_key, number)
                 if not stored_word:
-                    template = self.texts.get(
-                        "unregistered_template", "{number}問目は未登録です。"
-                    )
-                    msg = self._text_message(template.format(number=number))
+                    msg = self._text_message(self._t_unregistered_fmt(number=number))
                     self._reply(reply_token, [msg])
                     return
                 sender_settings = self._get_user_settings(sender_key)
@@ -535,23 +767,24 @@ class LineHandler:
                         video_path, preview_path = self.generator.generate_union_video(
                             stored_word, sender_font, fps=1
                         )
-                        video_url = self.image_store.get_video_url(
-                            "v", stored_word, sender_font, video_path
+                        # Upload the video and its preview at the same time.
+                        video_url_future = self._io_pool.submit(
+                            self.image_store.get_video_url,
+                            "v",
+                            stored_word,
+                            sender_font,
+                            video_path,
                         )
                         preview_url = self.image_store.get_image_url(
                             "p", stored_word, sender_font, preview_path
                         )
-                        self._reply(
-                            reply_token,
-                            [
-                                {
-                                    "type": "video",
-                                    "originalContentUrl": video_url,
-                                    "previewImageUrl": preview_url,
-                                }
-                            ],
+                        message = self._video_message(
+                            video_url_future.result(), preview_url
+                        )
+                        self._reply(reply_token, [message])
+                        self._io_pool.submit(
+                            self.image_store.cleanup, [video_path, preview_path]
                         )
-                        self.image_store.cleanup([video_path, preview_path])
                     else:
                         q_path, a_path, u_path = self.generator.generate_images_with_union(
                             stored_word, sender_font
@@ -560,47 +793,34 @@ class LineHandler:
                             "a", stored_word, sender_font, a_path
                         )
                         self._reply(reply_token, [self._image_message(a_url)])
-                        self.image_store.cleanup([q_path, a_path, u_path])
+                        self._io_pool.submit(
+                            self.image_store.cleanup, [q_path, a_path, u_path]
+                        )
                 except Exception as exc:
                     self.logger.error("LINE answer release error: %s", exc)
-                    generate_failed = self.texts.get(
-                        "generate_failed", "画像の生成に失敗しました。"
-                    )
-                    err = f"{self.texts.get('error_prefix', '')}{generate_failed}"
-                    self._reply(reply_token, [self._text_message(err)])
+                    msg = self._text_message(self._t_generate_failed)
+                    self._reply(reply_token, [msg])
                 return
             number_text = command_text if command_text else last_token
-            number = int(number_text) if number_text.isdigit() else 0
-            if number < 1 or number > 10:
-                bot_name = self.texts.get("bot_name", "文字合成ボット")
-                quiz_format = self.texts.get("quiz_format", f"@{bot_name} (問題番号)")
-                msg = self._text_message(f"出題時は「{quiz_format}」と送ってください。")
+            number = self._parse_quiz_number(number_text)
+            if not number:
+                msg = self._text_message(self._t_quiz_format)
                 self._reply(reply_token, [msg])
                 return
             stored_item = self.quiz_store.get_quiz_item(sender_key, number)
             stored_word = stored_item.get("word", "")
             if not stored_word:
-                template = self.texts.get(
-                    "unregistered_template", "{number}問目は未登録です。"
-                )
-                msg = self._text_message(template.format(number=number))
+                msg = self._text_message(self._t_unregistered_fmt(number=number))
                 self._reply(reply_token, [msg])
                 return
             sender_settings = self._get_user_settings(sender_key)
             sender_font = sender_settings.get("font", font_key)
             quiz_mode = stored_item.get("quiz_mode", "intersection")
             quiz_prompt = stored_item.get("quiz_prompt", "")
-            display_name = self.profile_client.get_display_name(
-                event.get("source", {}), sender_id
-            )
-            display_name = display_name or self.texts.get(
-                "mention_fallback", "ユーザー"
+            display_name = self.profile_client.get_display_name(source, sender_id)
+            answer_text = self._t_quiz_answer_fmt(
+                name=display_name or self._t_mention_fallback, number=number
             )
-            answer_template = self.texts.get(
-                "quiz_answer_template",
-                "【解答フォーマット】\n@{name} {number}.(解答)",
-            )
-            answer_text = answer_template.format(name=display_name, number=number)
             try:
                 prompt_text = self._resolve_quiz_prompt(quiz_mode, quiz_prompt)
                 if quiz_mode == "union":
@@ -618,7 +838,9 @@ class LineHandler:
                             self._text_message(answer_text),
                         ],
                     )
-                    self.image_store.cleanup([q_path, a_path, u_path])
+                    self._io_pool.submit(
+                        self.image_store.cleanup, [q_path, a_path, u_path]
+                    )
                 else:
                     if len(stored_word) >= 3:
                         q_path, a_path, u_path = self.generator.generate_images_with_union(
@@ -635,7 +857,9 @@ class LineHandler:
                                 self._text_message(answer_text),
                             ],
                         )
-                        self.image_store.cleanup([q_path, a_path, u_path])
+                        self._io_pool.submit(
+                            self.image_store.cleanup, [q_path, a_path, u_path]
+                        )
                     else:
                         q_path, a_path = self.generator.generate_images(
                             stored_word, sender_font
@@ -651,14 +875,11 @@ class LineHandler:
                                 self._text_message(answer_text),
                             ],
                         )
-                        self.image_store.cleanup([q_path, a_path])
+                        self._io_pool.submit(self.image_store.cleanup, [q_path, a_path])
             except Exception as exc:
                 self.logger.error("LINE group quiz generate error: %s", exc)
-                generate_failed = self.texts.get(
-                    "generate_failed", "画像の生成に失敗しました。"
-                )
-                err = f"{self.texts.get('error_prefix', '')}{generate_failed}"
-                self._reply(reply_token, [self._text_message(err)])
+                msg = self._text_message(self._t_generate_failed)
+                self._reply(reply_token, [msg])
             return
 
         if len(mentionees) == 1:
@@ -669,35 +890,27 @@ class LineHandler:
                 )
                 quiz_status = self._parse_quiz_message(answer_text)
                 if not quiz_status or quiz_status[0] != "ok":
-                    answer_format = self.texts.get(
-                        "answer_format",
-                        "解答は以下のフォーマットで送信してください。\n@出題者へのメンション (問題番号).(解答)",
-                    )
-                    msg = self._text_message(answer_format)
+                    msg = self._text_message(self._t_answer_format)
                     self._reply(reply_token, [msg])
                     return
                 _, number, word = quiz_status
                 stored_word = self.quiz_store.get_word(f"user:{target_id}", number)
                 if not stored_word:
-                    template = self.texts.get(
-                        "unregistered_template", "{number}問目は未登録です。"
-                    )
-                    msg = self._text_message(template.format(number=number))
+                    msg = self._text_message(self._t_unregistered_fmt(number=number))
                     self._reply(reply_token, [msg])
                     return
                 if stored_word and stored_word == word:
-                    result = self.texts.get("answer_correct", "正解")
+                    result = self._t_answer_correct
                 else:
-                    result = self.texts.get("answer_incorrect", "不正解")
-                display_name = self.profile_client.get_display_name(
-                    event.get("source", {}), sender_id
-                )
+                    result = self._t_answer_incorrect
+                display_name = self.profile_client.get_display_name(source, sender_id)
                 mention = self._build_mention_message(sender_id, result, display_name)
                 self._reply(reply_token, [mention])
 
     def _text_message(self, text: str, include_quick_reply: bool = False) -> dict:
         """Build a text message payload."""
-        message = {"type": "text", "text": text}
+        message = self._TEXT_TEMPLATE.copy()
+        message["text"] = text
         if include_quick_reply:
             quick_reply = self.quick_reply_builder()
             if quick_reply:
@@ -706,7 +919,16 @@ class LineHandler:
 
     def _image_message(self, url: str) -> dict:
         """Build an image message payload."""
-        return {"type": "image", "originalContentUrl": url, "previewImageUrl": url}
+        message = self._IMAGE_TEMPLATE.copy()
+        message["originalContentUrl"] = message["previewImageUrl"] = url
+        return message
+
+    def _video_message(self, url: str, preview_url: str) -> dict:
+        """Build a video message payload."""
+        message = self._VIDEO_TEMPLATE.copy()
+        message["originalContentUrl"] = url
+        message["previewImageUrl"] = preview_url
+        return message
 
     def _get_user_key(self, event: dict) -> str:
         """Return a stable key for the event source."""
@@ -719,29 +941,43 @@ class LineHandler:
             return f"room:{source['roomId']}"
         return "unknown"
 
+    def _load_all_settings(self) -> dict:
+        """Return all stored settings, loading them from the store once."""
+        settings = self._settings_cache
+        if settings is None:
+            with self._settings_lock:
+                # Another thread may have loaded or saved while this one waited.
+                settings = self._settings_cache
+                if settings is None:
+                    settings = self.settings_store.load_settings()
+                    self._settings_cache = settings
+        return settings
+
     def _get_user_settings(self, user_key: str) -> dict:
         """Load stored settings for a user key."""
-        settings = self.settings_store.load_settings()
-        return settings.get(user_key, {})
+        return dict(self._load_all_settings().get(user_key, {}))
 
     def _save_user_settings(self, user_key: str, user_settings: dict) -> bool:
         """Persist settings for a user key."""
-        settings = self.settings_store.load_settings()
-        settings[user_key] = user_settings
-        return self.settings_store.save_settings(settings)
+        with self._settings_lock:
+            settings = self._load_all_settings()
+            settings[user_key] = user_settings
+            saved = self.settings_store.save_settings(settings)
+            if not saved:
+                # Drop the unsaved change so later reads reload the stored state.
+                self._settings_cache = None
+        return saved
 
     def _normalize_font_key(self, text: str) -> str:
         """Normalize and validate a font key string."""
         return self.generator.normalize_font_key(text.strip().lower())
 
     def _parse_quiz_message(self, text: str) -> Optional[tuple]:
-        payload = text.strip()
-        if "." not in payload:
+        entry = QUIZ_ENTRY_RE.fullmatch(text)
+        if not entry:
             return None
-        number_text, word = payload.split(".", 1)
-        number_text = number_text.strip()
-        word = word.strip()
-        if not number_text.isdigit():
+        number_text, word = entry.groups()
+        if number_text is None:
             return ("invalid_number", None, None)
         number = int(number_text)
         if number < 1 or number > 10:
@@ -760,17 +996,8 @@ class LineHandler:
         quiz_mode: str,
         quiz_prompt: str = "",
     ) -> str:
-        dispatch_template = self.texts.get(
-            "quiz_dispatch_template",
-            f"グループで「@{self.texts.get('bot_name', '文字合成ボット')} "
-            "{number}」と送ると出題されます。",
-        )
-        dispatch_text = dispatch_template.format(number=number)
-        answer_release = self.texts.get(
-            "answer_release_format",
-            f"解答発表は「@{self.texts.get('bot_name', '文字合成ボット')} "
-            "答え (問題番号)」と送ってください。",
-        )
+        dispatch_text = self._t_quiz_dispatch_fmt(number=number)
+        answer_release = self._t_answer_release_format
         mode_label = self._quiz_mode_label(quiz_mode)
         prompt_suffix = f"\n問題文:{quiz_prompt}" if quiz_prompt else ""
         if old_word:
@@ -784,6 +1011,27 @@ class LineHandler:
             f"{dispatch_text}\n{answer_release}{prompt_suffix}"
         )
 
+    def _get_quiz_list_text(self, user_key: str) -> str:
+        """Return the quiz list text, cached until the user's quizzes change."""
+        version_of = getattr(self.quiz_store, "version", None)
+        if version_of is None:
+            return self._build_quiz_list_text(user_key)
+        # Read the version before the items so a concurrent write is never missed.
+        version = version_of(user_key)
+        cache = self._quiz_list_cache
+        with self._quiz_list_cache_lock:
+            cached = cache.get(user_key)
+            if cached is not None and cached[0] == version:
+                cache.move_to_end(user_key)
+                return cached[1]
+        text = self._build_quiz_list_text(user_key)
+        with self._quiz_list_cache_lock:
+            cache[user_key] = (version, text)
+            cache.move_to_end(user_key)
+            if len(cache) > QUIZ_LIST_CACHE_SIZE:
+                cache.popitem(last=False)
+        return text
+
     def _build_quiz_list_text(self, user_key: str) -> str:
         if hasattr(self.quiz_store, "list_quiz_items"):
             items = self.quiz_store.list_quiz_items(user_key)
@@ -791,57 +1039,38 @@ class LineHandler:
             items = {}
             for number, word in self.quiz_store.list_words(user_key).items():
                 items[number] = {"word": word, "quiz_mode": "intersection"}
-        unset_label = self.texts.get("quiz_unset", "未設定")
-        title = self.texts.get("quiz_list_title", "【問題一覧】")
-        lines = [title]
-        for number in range(1, 11):
-            item = items.get(number)
-            if not item:
-                lines.append(f"{number}. {unset_label}")
-                continue
-            word = item.get("word") or unset_label
-            if word == unset_label:
-                lines.append(f"{number}. {word}")
+        unset_label = self._t_quiz_unset
+        entries = self._quiz_list_unset_entries.copy()
+        for number, item in items.items():
+            key = f"q{number}"
+            word = item.get("word") if item else ""
+            if key not in entries or not word or word == unset_label:
                 continue
             mode_label = self._quiz_mode_label(item.get("quiz_mode", "intersection"))
             prompt = item.get("quiz_prompt", "")
             if prompt:
-                lines.append(f"{number}. {word}({mode_label})\n@{prompt}")
+                entries[key] = f"{word}({mode_label})\n@{prompt}"
             else:
-                lines.append(f"{number}. {word}({mode_label})")
-        dispatch_list = self.texts.get("quiz_list_footer") or self.texts.get(
-            "quiz_dispatch_list",
-            f"グループで「@{self.texts.get('bot_name', '文字合成ボット')} "
-            "(問題番号)」と送ると出題されます。",
-        )
-        lines.append(dispatch_list)
-        return "\n".join(lines)
+                entries[key] = f"{word}({mode_label})"
+        return self._quiz_list_template.format_map(entries)
 
     def _parse_bulk_quiz_list(self, text: str) -> Optional[dict]:
         lines = [line.strip() for line in text.splitlines() if line.strip()]
         if not lines:
             return None
-        title = self.texts.get("quiz_list_title", "【問題一覧】")
-        if not lines[0].startswith(title):
+        if not lines[0].startswith(self._t_quiz_list_title):
             return None
+        footer = self.texts.get("quiz_list_footer")
         entries = {}
         for line in lines[1:]:
-            footer = self.texts.get("quiz_list_footer")
-            if footer and line == footer:
+            if line == footer or line.startswith(QUIZ_LIST_DISPATCH_PREFIX):
                 continue
-            if line.startswith("グループで「@"):
-                continue
-            if "." not in line:
-                return {}
-            number_text, word = line.split(".", 1)
-            number_text = number_text.strip()
-            word = word.strip()
-            if not number_text.isdigit():
-                return {}
-            number = int(number_text)
-            if number < 1 or number > 10:
+            entry = QUIZ_ENTRY_RE.fullmatch(line)
+            if not entry:
                 return {}
-            if number in entries:
+            number_text, word = entry.groups()
+            number = self._parse_quiz_number(number_text)
+            if not number or number in entries:
                 return {}
             word_text, mode_label, prompt_text = self._split_word_with_mode(word)
             entries[number] = {
@@ -854,13 +1083,16 @@ class LineHandler:
         return entries
 
     def _apply_bulk_quiz_update(self, user_key: str, entries: dict) -> bool:
-        unset_label = self.texts.get("quiz_unset", "未設定")
+        unset_label = self._t_quiz_unset
         user_settings = self._get_user_settings(user_key)
         quiz_mode = user_settings.get("quiz_mode", "intersection")
         quiz_prompt = user_settings.get("quiz_prompt", "")
-        for number in range(1, 11):
-            if number not in entries:
-                return False
+        # A bulk update must cover every quiz number.
+        if not entries.keys() >= QUIZ_NUMBER_SET:
+            return False
+        # Validate every entry before writing so a bad line changes nothing.
+        items = {}
+        for number in QUIZ_NUMBERS:
             entry = entries[number]
             word = entry.get("word", "") if isinstance(entry, dict) else entry
             entry_mode = (
@@ -870,7 +1102,7 @@ class LineHandler:
                 entry.get("quiz_prompt") if isinstance(entry, dict) else None
             ) or quiz_prompt
             if word == unset_label:
-                self.quiz_store.delete_word(user_key, number)
+                items[number] = None
                 continue
             if len(word) < 2 or len(word) > 8:
                 return False
@@ -880,9 +1112,16 @@ class LineHandler:
                 return False
             if not self.parser._is_allowed_word(word):
                 return False
-            self.quiz_store.set_word(
-                user_key, number, word, entry_mode, entry_prompt
-            )
+            items[number] = (word, entry_mode, entry_prompt)
+        set_words_bulk = getattr(self.quiz_store, "set_words_bulk", None)
+        if set_words_bulk is not None:
+            set_words_bulk(user_key, items)
+            return True
+        for number, item in items.items():
+            if item is None:
+                self.quiz_store.delete_word(user_key, number)
+            else:
+                self.quiz_store.set_word(user_key, number, *item)
         return True
 
     def _quiz_mode_label(self, quiz_mode: str) -> str:
@@ -892,7 +1131,7 @@ class LineHandler:
         quiz_mode = user_settings.get("quiz_mode", "intersection")
         font_key = user_settings.get("font", self.default_font_key)
         quiz_prompt = user_settings.get("quiz_prompt", "")
-        unset_label = self.texts.get("quiz_unset", "未設定")
+        unset_label = self._t_quiz_unset
         prompt_text = quiz_prompt if quiz_prompt else unset_label
         return (
             "【現在の設定】\n"
@@ -916,7 +1155,7 @@ class LineHandler:
         return "intersection"
 
     def _split_word_with_mode(self, word: str) -> tuple:
-        match = re.match(r"^(.*?)(?:\(([^()]*)\))?(?:\s*@(.+))?$", word)
+        match = QUIZ_WORD_RE.match(word)
         if not match:
             return word, "", ""
         return (
@@ -925,42 +1164,50 @@ class LineHandler:
             (match.group(3) or "").strip(),
         )
 
-    def _is_bot_mentioned(self, message: dict) -> bool:
-        mentionees = message.get("mention", {}).get("mentionees", []) if message else []
-        for mentionee in mentionees:
-            if mentionee.get("userId") == self.bot_user_id:
-                return True
-        return False
+    def _is_bot_mentioned(self, mentionees: list) -> bool:
+        bot_user_id = self.bot_user_id
+        return any(mentionee.get("userId") == bot_user_id for mentionee in mentionees)
 
     def _build_mention_message(
         self, user_id: str, result: str, display_name: str = ""
     ) -> dict:
-        name = display_name or self.texts.get("mention_fallback", "ユーザー")
-        template = self.texts.get("answer_template", "{name}さん、{result}です。")
-        return {"type": "text", "text": template.format(name=name, result=result)}
+        name = display_name or self._t_mention_fallback
+        return self._text_message(self._t_answer_template_fmt(name=name, result=result))
 
     def _strip_mention_text(self, text: str, mentionees: list) -> str:
         """Remove mention tokens from the message text."""
         if not mentionees:
             return text
-        trimmed = text
-        for mentionee in sorted(
-            (m for m in mentionees if isinstance(m, dict)),
-            key=lambda m: m.get("index", 0),
-            reverse=True,
-        ):
+        spans = []
+        for mentionee in mentionees:
+            if not isinstance(mentionee, dict):
+                continue
             index = mentionee.get("index")
             length = mentionee.get("length")
             if isinstance(index, int) and isinstance(length, int) and length > 0:
-                trimmed = trimmed[:index] + trimmed[index + length :]
-        return trimmed
+                spans.append((index, index + length))
+        if not spans:
+            return text
+        spans.sort()
+        # Keep the text between mention spans and join it once.
+        parts = []
+        pos = 0
+        for start, end in spans:
+            if start > pos:
+                parts.append(text[pos:start])
+            pos = max(pos, end)
+        parts.append(text[pos:])
+        return "".join(parts)
 
-    def _parse_answer_release_number(self, text: str) -> int:
-        payload = text.strip()
-        if not payload.startswith("答え"):
+    def _parse_quiz_number(self, number_text: Optional[str]) -> int:
+        """Return the quiz number (1-10) written in number_text, or 0."""
+        if not number_text:
             return 0
-        number_text = payload[len("答え") :].strip()
-        if not number_text.isdigit():
+        number = QUIZ_NUMBER_TEXTS.get(number_text)
+        if number is not None:
+            return number
+        # Full-width or zero-padded digits.
+        if not QUIZ_NUMBER_RE.fullmatch(number_text):
             return 0
         number = int(number_text)
         if number < 1 or number > 10:
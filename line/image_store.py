@@ -1,10 +1,15 @@
 import os
 import secrets
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
 from urllib.parse import quote
 
 import requests
 
+# Seconds before expiry at which a cached GCS access token is refreshed.
+GCS_TOKEN_REFRESH_MARGIN = 60
+
 
 class BaseImageStore:
     def get_image_url(self, kind: str, word: str, font_key: str, local_path: str) -> str:
@@ -23,35 +28,43 @@ class LocalImageStore(BaseImageStore):
         if normalized_fqdn.startswith("http://"):
             normalized_fqdn = "https://" + normalized_fqdn[len("http://") :]
         self.server_fqdn = normalized_fqdn
+        # Checked once; URLs are only refused when they are actually requested.
+        self._fqdn_valid = normalized_fqdn.startswith("https://")
 
     def get_image_url(self, kind: str, word: str, font_key: str, local_path: str) -> str:
-        if not self.server_fqdn:
-            raise ValueError("SERVER_FQDN is required for LINE image replies.")
-        if not self.server_fqdn.startswith("https://"):
-            raise ValueError("SERVER_FQDN must start with https:// for LINE images.")
-        safe_word = quote(word)
-        font_param = ""
-        if font_key and font_key != "default":
-            font_param = f"?font={font_key}"
-        return f"{self.server_fqdn}/{kind}/{safe_word}{font_param}"
+        if not self._fqdn_valid:
+            self._raise_invalid_fqdn("image")
+        return self._build_url(kind, word, font_key)
 
     def get_video_url(self, kind: str, word: str, font_key: str, local_path: str) -> str:
-        if not self.server_fqdn:
-            raise ValueError("SERVER_FQDN is required for LINE video replies.")
-        if not self.server_fqdn.startswith("https://"):
-            raise ValueError("SERVER_FQDN must start with https:// for LINE videos.")
-        safe_word = quote(word)
-        font_param = ""
+        if not self._fqdn_valid:
+            self._raise_invalid_fqdn("video")
+        return self._build_url(kind, word, font_key)
+
+    def _build_url(self, kind: str, word: str, font_key: str) -> str:
         if font_key and font_key != "default":
-            font_param = f"?font={font_key}"
-        return f"{self.server_fqdn}/{kind}/{safe_word}{font_param}"
+            return f"{self.server_fqdn}/{kind}/{quote(word)}?font={font_key}"
+        return f"{self.server_fqdn}/{kind}/{quote(word)}"
+
+    def _raise_invalid_fqdn(self, media: str) -> None:
+        if not self.server_fqdn:
+            raise ValueError(f"SERVER_FQDN is required for LINE {media} replies.")
+        raise ValueError(f"SERVER_FQDN must start with https:// for LINE {media}s.")
 
 
 class GcsImageStore(BaseImageStore):
-    def __init__(self, bucket: str, prefix: str, logger):
+    def __init__(self, bucket: str, prefix: str, logger, session=None):
         self.bucket = bucket
         self.prefix = (prefix or "").strip("/").strip()
         self.logger = logger
+        # Keep-alive session so uploads reuse TLS connections to GCS.
+        self.http = session or requests.Session()
+        # Metadata server token, reused until shortly before it expires.
+        self._access_token = ""
+        self._access_token_expiry = 0.0
+        self._access_token_lock = threading.Lock()
+        # (UTC day number, "YYYY/MM/DD") of the last object name built.
+        self._date_prefix = (0, "")
 
     def get_image_url(self, kind: str, word: str, font_key: str, local_path: str) -> str:
         if not self.bucket:
@@ -87,7 +100,7 @@ class GcsImageStore(BaseImageStore):
     def _build_object_name(
         self, kind: str, word: str, font_key: str, local_path: str
     ) -> str:
-        date_prefix = datetime.utcnow().strftime("%Y/%m/%d")
+        date_prefix = self._get_date_prefix()
         token = secrets.token_hex(8)
         suffix = ""
         if font_key and font_key != "default":
@@ -98,6 +111,16 @@ class GcsImageStore(BaseImageStore):
             return f"{self.prefix}/{base}"
         return base
 
+    def _get_date_prefix(self) -> str:
+        day = int(time.time() // 86400)
+        cached_day, date_prefix = self._date_prefix
+        if cached_day != day:
+            date_prefix = datetime.fromtimestamp(day * 86400, timezone.utc).strftime(
+                "%Y/%m/%d"
+            )
+            self._date_prefix = (day, date_prefix)
+        return date_prefix
+
     def _upload_file(self, object_name: str, local_path: str, content_type: str) -> None:
         access_token = self._get_gcs_access_token()
         if not access_token:
@@ -111,19 +134,30 @@ class GcsImageStore(BaseImageStore):
             "Content-Type": content_type,
         }
         with open(local_path, "rb") as f:
-            response = requests.post(url, headers=headers, data=f.read(), timeout=10)
+            # Stream the file; requests sets Content-Length from its size.
+            response = self.http.post(url, headers=headers, data=f, timeout=10)
         if response.status_code >= 400:
             raise ValueError(
                 f"GCS upload failed: status={response.status_code} body={response.text[:500]}"
             )
 
     def _get_gcs_access_token(self) -> str:
+        with self._access_token_lock:
+            now = time.monotonic()
+            if self._access_token and now < self._access_token_expiry:
+                return self._access_token
+            access_token, expires_in = self._fetch_gcs_access_token()
+            self._access_token = access_token
+            self._access_token_expiry = now + expires_in - GCS_TOKEN_REFRESH_MARGIN
+            return access_token
+
+    def _fetch_gcs_access_token(self) -> tuple:
         url = "http://metadata.google.internal/computeMetadata/v1/instance/service-accounts/default/token"
         headers = {"Metadata-Flavor": "Google"}
-        response = requests.get(url, headers=headers, timeout=3)
+        response = self.http.get(url, headers=headers, timeout=3)
         if response.status_code >= 400:
             raise ValueError(
                 f"metadata token error: status={response.status_code} body={response.text[:200]}"
             )
         data = response.json()
-        return data.get("access_token", "")
+        return data.get("access_token", ""), int(data.get("expires_in", 3600))
@@ -1,103 +1,154 @@
+from functools import lru_cache
+
+# Distinct words whose allowed-character check result is remembered.
+ALLOWED_WORD_CACHE_SIZE = 4096
+# Code point ranges allowed in quiz words.
+ALLOWED_CHAR_RANGES = (
+    (0x3041, 0x309F),  # Hiragana
+    (0x30A0, 0x30FF),  # Katakana
+    (0x4E00, 0x9FFF),  # CJK Unified Ideographs (Kanji)
+    (0x0030, 0x0039),  # ASCII digits
+    (0x0041, 0x005A),  # ASCII uppercase
+    (0x0061, 0x007A),  # ASCII lowercase
+)
+# Menu commands recognized by an exact keyword match after the prefix.
+MENU_COMMAND_TYPES = (
+    "menu_generate",
+    "menu_register",
+    "menu_list",
+    "menu_settings",
+    "menu_usage",
+    "menu_mode",
+    "menu_font",
+)
+# str.translate table deleting every allowed character; a word is allowed when
+# nothing is left.
+ALLOWED_CHAR_DELETIONS = dict.fromkeys(
+    code for low, high in ALLOWED_CHAR_RANGES for code in range(low, high + 1)
+)
+
+
 class LineCommandParser:
     """Parse incoming text into structured LINE bot commands."""
 
     def __init__(self, keywords: dict):
         """Create a parser with keyword mappings."""
         self.keywords = keywords
+        # Keywords are fixed after construction, so resolve them once.
+        help_keyword = keywords.get("help", [])
+        # A keyword list becomes a set; a single string keeps its old `in` test.
+        self._kw_help = (
+            help_keyword if isinstance(help_keyword, str) else frozenset(help_keyword)
+        )
+        self._kw_setting = str(keywords.get("setting", ""))
+        list_keyword = keywords.get("list", "")
+        list_candidates = (
+            list_keyword if isinstance(list_keyword, (list, tuple)) else [list_keyword]
+        )
+        self._kw_list = tuple(str(item) for item in list_candidates if str(item))
+        self._kw_prompt = str(keywords.get("prompt", ""))
+        self._kw_mode_common = str(keywords.get("mode_common", ""))
+        self._kw_mode_union = str(keywords.get("mode_union", ""))
+        self._kw_font = str(keywords.get("font", ""))
+        self._kw_font_prefix = str(keywords.get("font_prefix", ""))
+        # keyword -> menu command type; the first type listed wins a shared keyword.
+        self._menu_commands = {}
+        for command_type in MENU_COMMAND_TYPES:
+            keyword = str(keywords.get(command_type, ""))
+            if keyword:
+                self._menu_commands.setdefault(keyword, command_type)
+        # Prefixed keyword -> parsed command. Each is resolved once through the
+        # full check order, so an exact keyword parses with one dict lookup.
+        help_keywords = () if isinstance(self._kw_help, str) else self._kw_help
+        self._keyword_commands = {}
+        for keyword in (
+            *help_keywords,
+            *self._kw_list,
+            *self._menu_commands,
+            self._kw_mode_common,
+            self._kw_mode_union,
+        ):
+            if not keyword or not isinstance(keyword, str):
+                continue
+            command = self._parse_prefixed(keyword)
+            if command:
+                self._keyword_commands[keyword] = command
+        # Users resend the same words, so remember each word's check result.
+        self._is_allowed_word = lru_cache(maxsize=ALLOWED_WORD_CACHE_SIZE)(
+            self._check_allowed_word
+        )
 
     def parse(self, text: str) -> dict:
         """Parse text into a command dictionary."""
         stripped = text.strip()
-        has_prefix = False
         if stripped.startswith(("/", "#")):
             stripped = stripped[1:].strip()
-            has_prefix = True
-        help_keywords = self.keywords.get("help", [])
-        if has_prefix and stripped in help_keywords:
+            command = self._keyword_commands.get(stripped)
+            if command is not None:
+                return command.copy()
+            # Plain words skip the prefixed command checks entirely.
+            command = self._parse_prefixed(stripped)
+            if command:
+                return command
+
+        font_prefix = self._kw_font_prefix
+        if font_prefix and stripped.startswith(font_prefix):
+            font_value = stripped[len(font_prefix) :].strip()
+            if not font_value:
+                return {"type": "menu_font"}
+            return {"type": "font", "value": font_value}
+
+        if "." in stripped:
+            return {"type": "unknown"}
+
+        word_type = self._validate_word(stripped)
+        if word_type == "both":
+            return {"type": "both", "word": stripped}
+        return {"type": word_type}
+
+    def _parse_prefixed(self, stripped: str) -> dict:
+        """Parse commands that are only accepted after a / or # prefix."""
+        if stripped in self._kw_help:
             return {"type": "help"}
 
-        setting = self._parse_setting(stripped) if has_prefix else {}
+        setting = self._parse_setting(stripped)
         if setting:
             return {"type": "setting", "setting": setting}
 
-        list_keyword = self.keywords.get("list", "")
-        list_candidates = (
-            list_keyword if isinstance(list_keyword, (list, tuple)) else [list_keyword]
-        )
-        list_candidates = [str(item) for item in list_candidates if str(item)]
-        if has_prefix and stripped in list_candidates:
+        if stripped in self._kw_list:
             return {"type": "list"}
 
-        menu_generate = str(self.keywords.get("menu_generate", ""))
-        if has_prefix and menu_generate and stripped == menu_generate:
-            return {"type": "menu_generate"}
-
-        menu_register = str(self.keywords.get("menu_register", ""))
-        if has_prefix and menu_register and stripped == menu_register:
-            return {"type": "menu_register"}
-
-        menu_list = str(self.keywords.get("menu_list", ""))
-        if has_prefix and menu_list and stripped == menu_list:
-            return {"type": "menu_list"}
-
-        menu_settings = str(self.keywords.get("menu_settings", ""))
-        if has_prefix and menu_settings and stripped == menu_settings:
-            return {"type": "menu_settings"}
-
-        menu_usage = str(self.keywords.get("menu_usage", ""))
-        if has_prefix and menu_usage and stripped == menu_usage:
-            return {"type": "menu_usage"}
+        menu_command = self._menu_commands.get(stripped)
+        if menu_command:
+            return {"type": menu_command}
 
-        menu_mode = str(self.keywords.get("menu_mode", ""))
-        if has_prefix and menu_mode and stripped == menu_mode:
-            return {"type": "menu_mode"}
-
-        menu_font = str(self.keywords.get("menu_font", ""))
-        if has_prefix and menu_font and stripped == menu_font:
-            return {"type": "menu_font"}
-
-        prompt_keyword = str(self.keywords.get("prompt", ""))
-        if has_prefix and prompt_keyword and stripped.startswith(prompt_keyword):
+        prompt_keyword = self._kw_prompt
+        if prompt_keyword and stripped.startswith(prompt_keyword):
             _, _, prompt_value = stripped.partition(" ")
             if not prompt_value.strip():
                 return {"type": "menu_prompt"}
             return {"type": "quiz_prompt", "value": prompt_value.strip()}
 
-        mode_common = str(self.keywords.get("mode_common", ""))
-        if has_prefix and mode_common and stripped == mode_common:
+        mode_common = self._kw_mode_common
+        if mode_common and stripped == mode_common:
             return {"type": "mode_common"}
 
-        mode_union = str(self.keywords.get("mode_union", ""))
-        if has_prefix and mode_union and stripped == mode_union:
+        mode_union = self._kw_mode_union
+        if mode_union and stripped == mode_union:
             return {"type": "mode_union"}
 
-        font_keyword = str(self.keywords.get("font", ""))
-        if has_prefix and stripped.startswith(font_keyword):
+        font_keyword = self._kw_font
+        if stripped.startswith(font_keyword):
             _, _, font_value = stripped.partition(" ")
             if not font_value.strip():
                 return {"type": "menu_font"}
             return {"type": "font", "value": font_value.strip()}
 
-        font_prefix = str(self.keywords.get("font_prefix", ""))
-        if font_prefix and stripped.startswith(font_prefix):
-            font_value = stripped[len(font_prefix) :].strip()
-            if not font_value:
-                return {"type": "menu_font"}
-            return {"type": "font", "value": font_value}
-
-        if "." in stripped:
-            return {"type": "unknown"}
-
-        if self._is_two_char_word(stripped):
-            if not self._is_allowed_word(stripped):
-                return {"type": "invalid_word"}
-            return {"type": "both", "word": stripped}
-
-        return {"type": "unknown"}
+        return {}
 
     def _parse_setting(self, text: str) -> dict:
         """Parse key=value settings command."""
-        setting_keyword = str(self.keywords.get("setting", ""))
+        setting_keyword = self._kw_setting
         if not text.startswith(setting_keyword):
             return {}
         _, _, rest = text.partition(" ")
@@ -110,28 +161,14 @@ class LineCommandParser:
             return {}
         return {key: value}
 
-    def _is_two_char_word(self, text: str) -> bool:
-        return 2 <= len(text) <= 8
-
-    def _is_allowed_word(self, text: str) -> bool:
-        for char in text:
-            if self._is_allowed_char(char):
-                continue
-            return False
-        return True
-
-    def _is_allowed_char(self, char: str) -> bool:
-        code = ord(char)
-        if 0x3041 <= code <= 0x309F:  # Hiragana
-            return True
-        if 0x30A0 <= code <= 0x30FF:  # Katakana
-            return True
-        if 0x4E00 <= code <= 0x9FFF:  # CJK Unified Ideographs (Kanji)
-            return True
-        if 0x0030 <= code <= 0x0039:  # ASCII digits
-            return True
-        if 0x0041 <= code <= 0x005A:  # ASCII uppercase
-            return True
-        if 0x0061 <= code <= 0x007A:  # ASCII lowercase
-            return True
-        return False
+    def _validate_word(self, text: str) -> str:
+        """Return the command type for a plain word: both, invalid_word or unknown."""
+        if not 2 <= len(text) <= 8:
+            return "unknown"
+        if not self._is_allowed_word(text):
+            return "invalid_word"
+        return "both"
+
+    def _check_allowed_word(self, text: str) -> bool:
+        # One C-level pass over the word instead of a Python loop per character.
+        return not text.translate(ALLOWED_CHAR_DELETIONS)
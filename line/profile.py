@@ -1,17 +1,30 @@
+import threading
+import time
+from collections import OrderedDict
+
 import requests
 
+# Display names kept per (source, user); names rarely change, so they expire slowly.
+PROFILE_CACHE_SIZE = 1024
+PROFILE_CACHE_TTL = 600
+
 
 class LineProfileClient:
-    def __init__(self, access_token: str, logger):
+    def __init__(self, access_token: str, logger, session=None):
         self.access_token = access_token
         self.logger = logger
+        # Keep-alive session so profile lookups reuse the TLS connection.
+        self.http = session or requests.Session()
+        self._headers = {"Authorization": f"Bearer {access_token}"}
         self.base_url = "https://api.line.me"
+        # profile URL -> (expiry on the monotonic clock, display name), oldest first
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def get_display_name(self, source: dict, user_id: str) -> str:
         if not self.access_token or not user_id:
             return ""
         source_type = source.get("type")
-        headers = {"Authorization": f"Bearer {self.access_token}"}
         try:
             if source_type == "group":
                 group_id = source.get("groupId", "")
@@ -26,11 +39,35 @@ class LineProfileClient:
             else:
                 url = f"{self.base_url}/v2/bot/profile/{user_id}"
 
-            response = requests.get(url, headers=headers, timeout=5)
+            display_name = self._get_cached(url)
+            if display_name:
+                return display_name
+            response = self.http.get(url, headers=self._headers, timeout=5)
             if response.status_code >= 400:
                 return ""
             data = response.json()
-            return data.get("displayName", "")
+            display_name = data.get("displayName", "")
+            if display_name:
+                self._set_cached(url, display_name)
+            return display_name
         except Exception as exc:
             self.logger.error("LINE profile fetch error: %s", exc)
             return ""
+
+    def _get_cached(self, url: str) -> str:
+        with self._cache_lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return ""
+            if entry[0] <= time.monotonic():
+                del self._cache[url]
+                return ""
+            self._cache.move_to_end(url)
+            return entry[1]
+
+    def _set_cached(self, url: str, display_name: str) -> None:
+        with self._cache_lock:
+            self._cache[url] = (time.monotonic() + PROFILE_CACHE_TTL, display_name)
+            self._cache.move_to_end(url)
+            if len(self._cache) > PROFILE_CACHE_SIZE:
+                self._cache.popitem(last=False)
@@ -1,18 +1,33 @@
 import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import count
+
+# Quiz slots a user can register.
+QUIZ_NUMBERS = range(1, 11)
 
 
 class SqliteQuizStore:
     def __init__(self, db_path: str, logger):
         self.db_path = db_path
         self.logger = logger
-        self._ensure_db()
-
-    def _ensure_db(self) -> None:
+        # Per-user change stamps; the database file is only written by this process.
+        self._versions = {}
+        self._version_counter = count(1)
         parent_dir = os.path.dirname(self.db_path)
         if parent_dir:
             os.makedirs(parent_dir, exist_ok=True)
+        # One connection shared by the handler's worker threads, one call at a time.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self._ensure_db()
+
+    def _ensure_db(self) -> None:
         with self._connect() as conn:
             conn.execute(
                 """
@@ -40,10 +55,11 @@ class SqliteQuizStore:
                     "ALTER TABLE quiz_items ADD COLUMN quiz_prompt TEXT NOT NULL DEFAULT ''"
                 )
 
+    # Yields the shared connection inside a transaction that commits on success.
+    @contextmanager
     def _connect(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        with self._lock, self._conn:
+            yield self._conn
 
     def set_word(
         self,
@@ -53,8 +69,13 @@ class SqliteQuizStore:
         quiz_mode: str = "intersection",
         quiz_prompt: str = "",
     ) -> str:
-        old_word = self.get_word(user_id, number)
+        # Read the previous word in the same transaction as the upsert.
         with self._connect() as conn:
+            row = conn.execute(
+                "SELECT word FROM quiz_items WHERE user_id=? AND number=?",
+                (user_id, number),
+            ).fetchone()
+            old_word = row["word"] if row else ""
             conn.execute(
                 """
                 INSERT INTO quiz_items (user_id, number, word, quiz_mode, quiz_prompt, updated_at)
@@ -66,8 +87,39 @@ class SqliteQuizStore:
                 """,
                 (user_id, number, word, quiz_mode, quiz_prompt, self._now()),
             )
+        self._bump_version(user_id)
         return old_word or ""
 
+    # items: number -> (word, quiz_mode, quiz_prompt), or None to delete; one commit.
+    def set_words_bulk(self, user_id: str, items: dict) -> None:
+        now = self._now()
+        rows = []
+        deletes = []
+        for number, item in items.items():
+            if item is None:
+                deletes.append((user_id, number))
+            else:
+                word, quiz_mode, quiz_prompt = item
+                rows.append((user_id, number, word, quiz_mode, quiz_prompt, now))
+        with self._connect() as conn:
+            if deletes:
+                conn.executemany(
+                    "DELETE FROM quiz_items WHERE user_id=? AND number=?", deletes
+                )
+            if rows:
+                conn.executemany(
+                    """
+                    INSERT INTO quiz_items (user_id, number, word, quiz_mode, quiz_prompt, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(user_id, number)
+                    DO UPDATE SET word=excluded.word, quiz_mode=excluded.quiz_mode,
+                    quiz_prompt=excluded.quiz_prompt,
+                    updated_at=excluded.updated_at
+                    """,
+                    rows,
+                )
+        self._bump_version(user_id)
+
     def get_word(self, user_id: str, number: int) -> str:
         item = self.get_quiz_item(user_id, number)
         return item["word"] if item else ""
@@ -92,6 +144,7 @@ class SqliteQuizStore:
                 "DELETE FROM quiz_items WHERE user_id=? AND number=?",
                 (user_id, number),
             )
+        self._bump_version(user_id)
 
     def list_words(self, user_id: str) -> dict:
         with self._connect() as conn:
@@ -119,27 +172,49 @@ class SqliteQuizStore:
             }
         return result
 
+    # A stamp that changes whenever the user's quiz items change.
+    def version(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+    def _bump_version(self, user_id: str) -> None:
+        self._versions[user_id] = next(self._version_counter)
+
     def _now(self) -> str:
         return datetime.utcnow().isoformat() + "Z"
 
 
 class DatastoreQuizStore:
-    def __init__(self, project_id: str, logger, kind: str = "line_quiz_items"):
+    def __init__(
+        self, project_id: str, logger, kind: str = "line_quiz_items", client=None
+    ):
         self.project_id = project_id
         self.logger = logger
         self.kind = kind
-        self._client = None
+        self._client = client
+        self._client_lock = threading.Lock()
+        if client is None:
+            # Import google.cloud and create the client before the first webhook
+            # needs it.
+            threading.Thread(target=self._prewarm_client, daemon=True).start()
 
     def _client_or_create(self):
         if self._client is None:
-            from google.cloud import datastore
+            with self._client_lock:
+                if self._client is None:
+                    from google.cloud import datastore
 
-            if self.project_id:
-                self._client = datastore.Client(project=self.project_id)
-            else:
-                self._client = datastore.Client()
+                    if self.project_id:
+                        self._client = datastore.Client(project=self.project_id)
+                    else:
+                        self._client = datastore.Client()
         return self._client
 
+    def _prewarm_client(self) -> None:
+        try:
+            self._client_or_create()
+        except Exception as exc:
+            self.logger.error("Datastore client prewarm failed: %s", exc)
+
     def _key(self, user_id: str, number: int):
         key_name = f"{user_id}:{number}"
         return self._client_or_create().key(self.kind, key_name)
@@ -173,6 +248,39 @@ class DatastoreQuizStore:
         item = self.get_quiz_item(user_id, number)
         return item["word"] if item else ""
 
+    # items: number -> (word, quiz_mode, quiz_prompt), or None to delete; one commit.
+    def set_words_bulk(self, user_id: str, items: dict) -> None:
+        from google.cloud import datastore
+
+        client = self._client_or_create()
+        now = datetime.utcnow()
+        entities = []
+        delete_keys = []
+        for number, item in items.items():
+            if item is None:
+                delete_keys.append(self._key(user_id, number))
+                continue
+            word, quiz_mode, quiz_prompt = item
+            entity = datastore.Entity(key=self._key(user_id, number))
+            entity.update(
+                {
+                    "user_id": user_id,
+                    "number": number,
+                    "word": word,
+                    "quiz_mode": quiz_mode,
+                    "quiz_prompt": quiz_prompt,
+                    "updated_at": now,
+                }
+            )
+            entities.append(entity)
+        # Inside the transaction both calls only queue mutations; they are
+        # committed together when the block exits.
+        with client.transaction():
+            if entities:
+                client.put_multi(entities)
+            if delete_keys:
+                client.delete_multi(delete_keys)
+
     def get_quiz_item(self, user_id: str, number: int) -> dict:
         entity = self._client_or_create().get(self._key(user_id, number))
         if not entity:
@@ -187,28 +295,16 @@ class DatastoreQuizStore:
         self._client_or_create().delete(self._key(user_id, number))
 
     def list_words(self, user_id: str) -> dict:
-        query = self._client_or_create().query(kind=self.kind)
-        query.add_filter("user_id", "=", user_id)
         result = {}
-        for entity in query.fetch():
-            try:
-                number = int(entity.get("number", 0))
-            except (TypeError, ValueError):
-                continue
+        for number, entity in self._get_user_entities(user_id).items():
             word = entity.get("word", "")
             if word:
                 result[number] = word
         return result
 
     def list_quiz_items(self, user_id: str) -> dict:
-        query = self._client_or_create().query(kind=self.kind)
-        query.add_filter("user_id", "=", user_id)
         result = {}
-        for entity in query.fetch():
-            try:
-                number = int(entity.get("number", 0))
-            except (TypeError, ValueError):
-                continue
+        for number, entity in self._get_user_entities(user_id).items():
             word = entity.get("word", "")
             if not word:
                 continue
@@ -218,3 +314,10 @@ class DatastoreQuizStore:
                 "quiz_prompt": entity.get("quiz_prompt", "") or "",
             }
         return result
+
+    # Every quiz slot has a known key, so one batched lookup replaces the query.
+    def _get_user_entities(self, user_id: str) -> dict:
+        keys = [self._key(user_id, number) for number in QUIZ_NUMBERS]
+        numbers = {key.name: number for key, number in zip(keys, QUIZ_NUMBERS)}
+        entities = self._client_or_create().get_multi(keys)
+        return {numbers[entity.key.name]: entity for entity in entities}
@@ -4,10 +4,12 @@ import requests
 class LineReplyClient:
     """Send replies to LINE Messaging API."""
 
-    def __init__(self, access_token: str, logger):
-        """Initialize reply client with access token."""
+    def __init__(self, access_token: str, logger, session=None):
+        """Initialize reply client with access token and optional HTTP session."""
         self.access_token = access_token
         self.logger = logger
+        # requests.Session keeps the TLS connection alive between replies.
+        self.http = session or requests.Session()
         self.reply_url = "https://api.line.me/v2/bot/message/reply"
 
     def reply(self, reply_token: str, messages: list) -> bool:
@@ -17,7 +19,7 @@ class LineReplyClient:
             return False
         payload = {"replyToken": reply_token, "messages": messages}
         headers = {"Authorization": f"Bearer {self.access_token}"}
-        response = requests.post(
+        response = self.http.post(
             self.reply_url, json=payload, headers=headers, timeout=10
         )
         if response.status_code >= 400:
@@ -1,12 +1,18 @@
 import base64
-import hashlib
 import hmac
+from typing import Union
 
+# Length of a base64-encoded HMAC-SHA256 digest.
+SIGNATURE_LENGTH = 44
 
-def verify_signature(secret: str, body: bytes, signature: str) -> bool:
+
+def verify_signature(secret: Union[str, bytes], body: bytes, signature: str) -> bool:
     """Validate LINE webhook signature using channel secret."""
     if not secret:
         return False
-    mac = hmac.new(secret.encode("utf-8"), body, digestmod=hashlib.sha256).digest()
+    if isinstance(secret, str):
+        secret = secret.encode("utf-8")
+    # One-shot HMAC over the raw body bytes; no hmac object is created.
+    mac = hmac.digest(secret, body, "sha256")
     expected = base64.b64encode(mac).decode("utf-8")
     return hmac.compare_digest(expected, signature or "")
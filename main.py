@@ -7,7 +7,9 @@ import json
 import secrets
 from datetime import datetime, timedelta
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlencode
+from urllib3.util.retry import Retry
 from flask import (
     Flask,
     render_template,
@@ -52,6 +54,8 @@ line_bot_name = os.getenv("LINE_BOT_NAME", "").strip() or "文字合成ボット
 line_quiz_db_path = os.getenv("LINE_QUIZ_DB_PATH", "line/quiz.db").strip()
 line_quiz_store_mode = os.getenv("LINE_QUIZ_STORE", "sqlite").strip().lower()
 line_firestore_project = os.getenv("LINE_FIRESTORE_PROJECT", "").strip()
+# 1/true でWebhookに即時応答し、イベントはバックグラウンドで処理する
+line_async_events = os.getenv("LINE_ASYNC_EVENTS", "").strip().lower() in ("1", "true")
 
 def _mask_presence(value: str) -> str:
     return "set" if value else "missing"
@@ -285,6 +289,18 @@ else:
 if not line_bot_user_id:
     logger.warning("LINE_BOT_USER_ID is missing; group quiz is disabled.")
 
+# LINE API 呼び出しで共有する HTTP セッション（接続を再利用する）
+line_http_session = requests.Session()
+line_http_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=20,
+        # 接続確立の失敗のみ再試行する（返信トークンは一度しか使えないため）
+        max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2),
+    ),
+)
+
 line_handler = LineHandler(
     channel_secret=line_channel_secret,
     channel_access_token=line_channel_access_token,
@@ -302,7 +318,11 @@ line_handler = LineHandler(
     settings_quick_reply_builder=build_line_settings_quick_reply,
     mode_quick_reply_builder=build_line_mode_quick_reply,
     font_quick_reply_builder=build_line_font_quick_reply,
-    profile_client=LineProfileClient(line_channel_access_token, logger),
+    profile_client=LineProfileClient(
+        line_channel_access_token, logger, line_http_session
+    ),
+    http_session=line_http_session,
+    async_events=line_async_events,
 )
 
 
@@ -1,15 +1,24 @@
 import types
 
 import pytest
+from PIL import Image, ImageFont
 
-from image_generator import ImageGenerator
+from image_generator import (
+    BLACK,
+    BLUE,
+    PALETTE_INDEX,
+    PURPLE,
+    RED,
+    RED_SOFT,
+    ImageGenerator,
+)
 
 
 class DummyImage:
     def __init__(self):
         self.saved_paths = []
 
-    def save(self, path):
+    def save(self, path, **kwargs):
         self.saved_paths.append(path)
 
 
@@ -25,6 +34,12 @@ def test_normalize_font_key_accepts_default(monkeypatch):
     assert generator.normalize_font_key(None) == "default"
 
 
+def test_normalize_font_key_accepts_known_keys(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    assert generator.normalize_font_key("default") == "default"
+    assert generator.normalize_font_key("mincho") == "mincho"
+
+
 def test_normalize_font_key_rejects_invalid(monkeypatch):
     generator = _build_generator(monkeypatch)
     with pytest.raises(ValueError):
@@ -45,7 +60,7 @@ def test_generate_images_uses_suffix_and_saves(monkeypatch):
     dummy_a = DummyImage()
 
     monkeypatch.setattr(ImageGenerator, "_get_font_for_key", lambda self, key: object())
-    monkeypatch.setattr(ImageGenerator, "_create_kanji_image", lambda *a, **k: object())
+    monkeypatch.setattr(ImageGenerator, "_get_kanji_mask", lambda *a, **k: object())
     monkeypatch.setattr(
         ImageGenerator, "_process_pixels", lambda *a, **k: (dummy_q, dummy_a)
     )
@@ -55,3 +70,249 @@ def test_generate_images_uses_suffix_and_saves(monkeypatch):
     assert a_path.endswith("A_ab_mincho.png")
     assert dummy_q.saved_paths == [q_path]
     assert dummy_a.saved_paths == [a_path]
+
+
+def _mask_with_black_box(generator, box):
+    mask = Image.new("1", (1024, 1024), 0)
+    mask.paste(255, box)
+    return generator._pack_mask(mask)
+
+
+def test_process_pixels_colors_common_and_exclusive_regions(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    mask1 = _mask_with_black_box(generator, (0, 0, 20, 10))
+    mask2 = _mask_with_black_box(generator, (10, 0, 30, 10))
+
+    q_image, a_image = generator._process_pixels(mask1, mask2)
+    q_image, a_image = q_image.convert("RGB"), a_image.convert("RGB")
+
+    assert q_image.getpixel((15, 5)) == (0, 0, 0)
+    assert q_image.getpixel((5, 5)) == (255, 255, 255)
+    assert a_image.getpixel((15, 5)) == PURPLE
+    assert a_image.getpixel((5, 5)) == BLUE
+    assert a_image.getpixel((25, 5)) == RED
+    assert a_image.getpixel((50, 50)) == (255, 255, 255)
+
+
+def test_process_union_pixels_marks_either_black_pixel(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    mask1 = _mask_with_black_box(generator, (0, 0, 20, 10))
+    mask2 = _mask_with_black_box(generator, (10, 0, 30, 10))
+
+    u_image = generator._process_union_pixels(mask1, mask2).convert("RGB")
+
+    assert u_image.getpixel((5, 5)) == (0, 0, 0)
+    assert u_image.getpixel((25, 5)) == (0, 0, 0)
+    assert u_image.getpixel((35, 5)) == (255, 255, 255)
+
+
+def test_process_intersection_and_union_multi_reduce_all_glyphs(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    masks = [
+        _mask_with_black_box(generator, (0, 0, 30, 10)),
+        _mask_with_black_box(generator, (10, 0, 40, 10)),
+        _mask_with_black_box(generator, (20, 0, 50, 10)),
+    ]
+
+    q_image = generator._process_intersection_pixels(masks).convert("RGB")
+    u_image = generator._process_union_pixels_multi(masks).convert("RGB")
+
+    assert q_image.getpixel((25, 5)) == (0, 0, 0)
+    assert q_image.getpixel((15, 5)) == (255, 255, 255)
+    assert u_image.getpixel((5, 5)) == (0, 0, 0)
+    assert u_image.getpixel((45, 5)) == (0, 0, 0)
+    assert u_image.getpixel((55, 5)) == (255, 255, 255)
+
+
+def test_process_step_pixels_classifies_prefix_and_next_glyph(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    masks = [
+        _mask_with_black_box(generator, (0, 0, 30, 10)),
+        _mask_with_black_box(generator, (10, 0, 40, 10)),
+        _mask_with_black_box(generator, (20, 0, 50, 10)),
+    ]
+
+    frame = generator._process_step_pixels(
+        masks[0] & masks[1], masks[0] | masks[1], masks[2]
+    ).convert("RGB")
+
+    assert frame.getpixel((5, 5)) == RED_SOFT
+    assert frame.getpixel((15, 5)) == RED
+    assert frame.getpixel((25, 5)) == PURPLE
+    assert frame.getpixel((35, 5)) == BLUE
+    assert frame.getpixel((45, 5)) == BLUE
+    assert frame.getpixel((55, 5)) == (255, 255, 255)
+
+
+def test_iter_video_frames_matches_each_step_and_intersection(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    masks = [
+        _mask_with_black_box(generator, (0, 0, 30, 10)),
+        _mask_with_black_box(generator, (10, 0, 40, 10)),
+        _mask_with_black_box(generator, (20, 0, 50, 10)),
+    ]
+
+    frames = list(generator._iter_video_frames(masks))
+
+    assert len(frames) == 3
+    assert frames[0].tobytes() == (
+        generator._process_step_pixels(masks[0], masks[0], masks[1]).tobytes()
+    )
+    assert frames[1].convert("RGB").getpixel((25, 5)) == PURPLE
+    assert frames[2].tobytes() == (
+        generator._process_intersection_pixels(masks).tobytes()
+    )
+
+
+def test_black_mask_treats_dark_antialiased_pixels_as_black(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    kanji = Image.new("L", (1024, 1024), 255)
+    kanji.putpixel((0, 0), 0)
+    kanji.putpixel((1, 0), 127)
+    kanji.putpixel((2, 0), 128)
+
+    mask = generator._black_mask(kanji)
+
+    assert mask.getpixel((0, 0)) == 255
+    assert mask.getpixel((1, 0)) == 255
+    assert mask.getpixel((2, 0)) == 0
+
+
+def test_fonts_are_loaded_once_at_init(monkeypatch):
+    loaded = []
+
+    def fake_truetype(path, size):
+        loaded.append((path, size))
+        return object()
+
+    monkeypatch.setattr("image_generator.os.path.exists", lambda path: True)
+    monkeypatch.setattr("image_generator.ImageFont.truetype", fake_truetype)
+    generator = _build_generator(monkeypatch)
+    loaded_at_init = list(loaded)
+
+    first = generator._get_font_for_key("mincho")
+    second = generator._get_font_for_key("mincho")
+
+    assert first is second
+    assert loaded == loaded_at_init
+    assert loaded.count((generator.font_key_map["mincho"], 1024)) == 1
+
+
+def test_get_font_for_key_rejects_unavailable_font(monkeypatch):
+    monkeypatch.setattr("image_generator.os.path.exists", lambda path: False)
+    generator = _build_generator(monkeypatch)
+
+    with pytest.raises(ValueError):
+        generator._get_font_for_key("mincho")
+
+
+def test_get_kanji_mask_reuses_cached_mask(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    rendered = []
+
+    def fake_create(self, char, font):
+        rendered.append(char)
+        return Image.new("L", (1024, 1024), 255)
+
+    monkeypatch.setattr(ImageGenerator, "_create_kanji_image", fake_create)
+
+    first = generator._get_kanji_mask("a", "default")
+    second = generator._get_kanji_mask("a", "default")
+
+    assert first is second
+    assert rendered == ["a"]
+
+
+def test_get_kanji_mask_evicts_least_recently_used(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    monkeypatch.setattr("image_generator.MASK_CACHE_SIZE", 2)
+    monkeypatch.setattr(
+        ImageGenerator,
+        "_create_kanji_image",
+        lambda self, char, font: Image.new("L", (1024, 1024), 255),
+    )
+
+    generator._get_kanji_mask("a", "default")
+    generator._get_kanji_mask("b", "default")
+    generator._get_kanji_mask("a", "default")
+    generator._get_kanji_mask("c", "default")
+
+    assert list(generator._mask_cache) == [("a", "default"), ("c", "default")]
+
+
+def test_pack_and_unpack_mask_round_trip(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    mask = Image.new("1", (1024, 1024), 0)
+    mask.paste(255, (3, 5, 70, 9))
+
+    restored = generator._unpack_mask(generator._pack_mask(mask))
+
+    assert restored.tobytes() == mask.tobytes()
+
+
+def test_create_kanji_image_upscales_smaller_raster(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    monkeypatch.setattr("image_generator.GLYPH_RASTER_SIZE", 256)
+
+    kanji = generator._create_kanji_image("a", ImageFont.load_default())
+
+    assert kanji.mode == "L"
+    assert kanji.size == (1024, 1024)
+
+
+class DummyStdin:
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    def close(self):
+        self.closed = True
+
+
+class DummyProcess:
+    def __init__(self, cmd, **kwargs):
+        self.cmd = cmd
+        self.stdin = DummyStdin()
+
+    def wait(self):
+        return 0
+
+
+def test_build_video_from_frames_streams_raw_frames(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    generator.background_size = (2, 2)
+    processes = []
+
+    def fake_popen(cmd, **kwargs):
+        process = DummyProcess(cmd, **kwargs)
+        processes.append(process)
+        return process
+
+    monkeypatch.setattr("image_generator.subprocess.Popen", fake_popen)
+    frames = [generator._new_palette_image(), generator._new_palette_image()]
+    frames[1].paste(PALETTE_INDEX[BLACK], (0, 0, 1, 2))
+
+    generator._build_video_from_frames(frames, 2, "out.mp4")
+
+    process = processes[0]
+    assert process.cmd[process.cmd.index("-pix_fmt") + 1] == "yuv420p"
+    assert process.cmd[process.cmd.index("-s") + 1] == "2x2"
+    assert process.cmd[process.cmd.index("-i") + 1] == "-"
+    assert process.stdin.chunks == [
+        bytes([235, 235, 235, 235, 128, 128]),
+        bytes([16, 235, 16, 235, 128, 128]),
+    ]
+    assert process.stdin.closed
+
+
+def test_process_pixels_returns_palette_images(monkeypatch):
+    generator = _build_generator(monkeypatch)
+    mask = _mask_with_black_box(generator, (0, 0, 20, 10))
+
+    q_image, a_image = generator._process_pixels(mask, mask)
+
+    assert q_image.mode == "P"
+    assert a_image.mode == "P"
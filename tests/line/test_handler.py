@@ -2,8 +2,11 @@ import base64
 import hashlib
 import hmac
 import json
+import threading
+import time
 
 from line.handler import LineHandler
+from line.quiz_store import SqliteQuizStore
 
 # Test input/behavior overview:
 # - "ab" -> text + Q image + U image + A image (2-char flow)
@@ -59,8 +62,10 @@ class DummyGenerator:
 class InMemoryStore:
     def __init__(self):
         self.data = {}
+        self.load_count = 0
 
     def load_settings(self):
+        self.load_count += 1
         return dict(self.data)
 
     def save_settings(self, settings):
@@ -77,6 +82,9 @@ class DummyLogger:
             msg = msg % args
         self.messages.append(msg)
 
+    def warning(self, msg, *args):
+        self.error(msg, *args)
+
 
 class DummyResponse:
     def __init__(self, status_code=200, text="OK"):
@@ -84,6 +92,17 @@ class DummyResponse:
         self.text = text
 
 
+class DummySession:
+    """Stands in for the handler's requests.Session and records each reply."""
+
+    def __init__(self):
+        self.calls = []
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.calls.append({"url": url, "json": json, "headers": headers})
+        return DummyResponse()
+
+
 def _sign(body: bytes, secret: str) -> str:
     mac = hmac.new(secret.encode("utf-8"), body, digestmod=hashlib.sha256).digest()
     return base64.b64encode(mac).decode("utf-8")
@@ -98,6 +117,8 @@ def _build_handler(
     mode_builder=None,
     font_builder=None,
     bot_user_id="bot",
+    async_events=False,
+    http_session=None,
 ):
     class DummyImageStore:
         def __init__(self):
@@ -243,6 +264,8 @@ def _build_handler(
         font_quick_reply_builder=font_builder,
         bot_user_id=bot_user_id,
         profile_client=DummyProfileClient(),
+        http_session=http_session or DummySession(),
+        async_events=async_events,
     )
 
 
@@ -258,44 +281,97 @@ def test_handle_callback_rejects_invalid_signature(monkeypatch):
     assert text == "INVALID"
 
 
-def test_follow_event_sends_welcome_message(monkeypatch):
+def test_handle_callback_rejects_missing_signature_and_oversized_body(monkeypatch):
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
+    handler = _build_handler(store, generator, logger, lambda: None)
 
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["url"] = url
-        captured["json"] = json
-        return DummyResponse()
+    def fail_verify(*args):
+        raise AssertionError("signature should not be verified")
+
+    monkeypatch.setattr("line.handler.verify_signature", fail_verify)
+    monkeypatch.setattr("line.handler.MAX_WEBHOOK_BODY_BYTES", 16)
+
+    assert handler.handle_callback(b'{"events":[]}', "") == ("INVALID", 403)
+    assert handler.handle_callback(b'{"events":[]}', "bad") == ("INVALID", 403)
+    assert handler.handle_callback(b" " * 17, "sig") == ("BAD", 400)
+
+
+def test_handle_callback_rejects_malformed_body(monkeypatch):
+    store = InMemoryStore()
+    generator = DummyGenerator()
+    logger = DummyLogger()
+    handler = _build_handler(store, generator, logger, lambda: None)
+
+    body = b'{"events":'
+    text, status = handler.handle_callback(body, _sign(body, "secret"))
+    assert status == 400
+    assert text == "BAD"
+
+    body = b'["events"]'
+    assert handler.handle_callback(body, _sign(body, "secret")) == ("BAD", 400)
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
 
-    handler = _build_handler(store, generator, logger, lambda: {"items": []})
+def test_follow_event_sends_welcome_message():
+    store = InMemoryStore()
+    generator = DummyGenerator()
+    logger = DummyLogger()
+    session = DummySession()
+
+    handler = _build_handler(
+        store, generator, logger, lambda: {"items": []}, http_session=session
+    )
     payload = {"events": [{"type": "follow", "replyToken": "rt"}]}
     body = json.dumps(payload).encode("utf-8")
     signature = _sign(body, "secret")
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    messages = captured["json"]["messages"]
+    assert len(session.calls) == 1
+    assert session.calls[0]["url"] == "https://api.line.me/v2/bot/message/reply"
+    assert session.calls[0]["headers"] == {"Authorization": "Bearer token"}
+    assert session.calls[0]["json"]["replyToken"] == "rt"
+    messages = session.calls[0]["json"]["messages"]
     assert messages[0]["text"] == "WELCOME USAGE"
     assert "quickReply" in messages[0]
 
 
-def test_text_message_returns_text_and_both_images(monkeypatch):
+def test_empty_text_message_is_ignored():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
+    session = DummySession()
 
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
+    payload = {
+        "events": [
+            {
+                "type": "message",
+                "replyToken": "rt",
+                "message": {"type": "text", "text": ""},
+                "source": {"type": "user", "userId": "u1"},
+            }
+        ]
+    }
+    body = json.dumps(payload).encode("utf-8")
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    assert handler.handle_callback(body, _sign(body, "secret")) == ("OK", 200)
+    assert session.calls == []
+    assert store.load_count == 0
 
-    handler = _build_handler(store, generator, logger, lambda: None)
+
+def test_text_message_returns_text_and_both_images():
+    store = InMemoryStore()
+    generator = DummyGenerator()
+    logger = DummyLogger()
+    session = DummySession()
+
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -312,7 +388,7 @@ def test_text_message_returns_text_and_both_images(monkeypatch):
     text, status = handler.handle_callback(body, signature)
     assert status == 200
     assert generator.calls == [("ab", "default", "union")]
-    messages = captured["json"]["messages"]
+    messages = session.calls[-1]["json"]["messages"]
     assert len(messages) == 4
     assert messages[0]["type"] == "text"
     assert messages[1]["originalContentUrl"].endswith("/q/ab")
@@ -320,19 +396,15 @@ def test_text_message_returns_text_and_both_images(monkeypatch):
     assert messages[3]["originalContentUrl"].endswith("/a/ab")
 
 
-def test_text_message_returns_video_for_three_chars(monkeypatch):
+def test_text_message_returns_video_for_three_chars():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    session = DummySession()
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -352,26 +424,32 @@ def test_text_message_returns_video_for_three_chars(monkeypatch):
         ("abc", "default", "union"),
         ("abc", "default", "video", 1),
     ]
-    messages = captured["json"]["messages"]
+    messages = session.calls[-1]["json"]["messages"]
     assert messages[0]["type"] == "text"
     assert messages[1]["type"] == "image"
     assert messages[2]["type"] == "image"
     assert messages[3]["type"] == "video"
+    handler._io_pool.shutdown(wait=True)
+    assert handler.image_store.cleaned == [
+        [
+            "/tmp/Q_abc.png",
+            "/tmp/A_abc.png",
+            "/tmp/U_abc.png",
+            "/tmp/V_abc.mp4",
+            "/tmp/P_abc.png",
+        ]
+    ]
 
 
-def test_font_command_updates_user_setting(monkeypatch):
+def test_font_command_updates_user_setting():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    session = DummySession()
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -388,22 +466,159 @@ def test_font_command_updates_user_setting(monkeypatch):
     text, status = handler.handle_callback(body, signature)
     assert status == 200
     assert store.data == {"user:u1": {"font": "mincho"}}
-    assert "FONT mincho" in captured["json"]["messages"][0]["text"]
+    assert "FONT mincho" in session.calls[-1]["json"]["messages"][0]["text"]
+    assert store.load_count == 1
+
+    handler.handle_callback(body, signature)
+    assert store.load_count == 1
 
 
-def test_setting_command_updates_font(monkeypatch):
+def test_events_from_different_users_are_all_handled():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
+    session = DummySession()
 
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
+    payload = {
+        "events": [
+            {
+                "type": "message",
+                "replyToken": f"rt{user}",
+                "message": {"type": "text", "text": "font_mincho"},
+                "source": {"userId": f"u{user}"},
+            }
+            for user in range(3)
+        ]
+    }
+    body = json.dumps(payload).encode("utf-8")
+    signature = _sign(body, "secret")
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    text, status = handler.handle_callback(body, signature)
+    assert status == 200
+    replied = [call["json"]["replyToken"] for call in session.calls]
+    assert sorted(replied) == ["rt0", "rt1", "rt2"]
+    assert store.data == {f"user:u{user}": {"font": "mincho"} for user in range(3)}
+    assert store.load_count == 1
 
-    handler = _build_handler(store, generator, logger, lambda: None)
+
+def test_events_from_one_user_reply_in_order_of_handling():
+    store = InMemoryStore()
+    generator = DummyGenerator()
+    logger = DummyLogger()
+
+    class SlowFirstReplySession(DummySession):
+        def post(self, url, json=None, headers=None, timeout=None):
+            if json["replyToken"] == "rt0":
+                # A slow first reply must not let the second one overtake it.
+                time.sleep(0.05)
+            return super().post(url, json=json, headers=headers, timeout=timeout)
+
+    session = SlowFirstReplySession()
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
+    payload = {
+        "events": [
+            {
+                "type": "message",
+                "replyToken": f"rt{index}",
+                "message": {"type": "text", "text": text},
+                "source": {"userId": "u1"},
+            }
+            for index, text in enumerate(["font_mincho", "#help"])
+        ]
+    }
+    body = json.dumps(payload).encode("utf-8")
+
+    text, status = handler.handle_callback(body, _sign(body, "secret"))
+    assert status == 200
+    replied = [
+        (call["json"]["replyToken"], call["json"]["messages"][0]["text"])
+        for call in session.calls
+    ]
+    assert replied == [("rt0", "FONT mincho"), ("rt1", "USAGE")]
+    assert store.data == {"user:u1": {"font": "mincho"}}
+
+
+def test_async_events_are_acknowledged_then_handled():
+    store = InMemoryStore()
+    generator = DummyGenerator()
+    logger = DummyLogger()
+    session = DummySession()
+
+    handler = _build_handler(
+        store, generator, logger, lambda: None, async_events=True, http_session=session
+    )
+    payload = {
+        "events": [
+            {
+                "type": "message",
+                "replyToken": "rt",
+                "message": {"type": "text", "text": "font_mincho"},
+                "source": {"userId": "u1"},
+            }
+        ]
+    }
+    body = json.dumps(payload).encode("utf-8")
+
+    assert handler.handle_callback(body, _sign(body, "secret")) == ("OK", 200)
+    handler._event_queue.join()
+    assert store.data == {"user:u1": {"font": "mincho"}}
+    assert session.calls[-1]["json"]["replyToken"] == "rt"
+
+
+def test_first_settings_load_does_not_overwrite_a_concurrent_save():
+    class SlowFirstLoadStore(InMemoryStore):
+        def __init__(self):
+            super().__init__()
+            self.loading = threading.Event()
+            self.release = threading.Event()
+
+        def load_settings(self):
+            first = not self.loading.is_set()
+            self.loading.set()
+            if first:
+                self.release.wait(timeout=5)
+            return super().load_settings()
+
+    store = SlowFirstLoadStore()
+    store.data = {"user:u1": {"font": "mincho"}}
+    handler = _build_handler(store, DummyGenerator(), DummyLogger(), lambda: None)
+
+    reader = threading.Thread(target=handler._get_user_settings, args=("user:u1",))
+    reader.start()
+    store.loading.wait(timeout=5)
+    writer = threading.Thread(
+        target=handler._save_user_settings, args=("user:u2", {"font": "dejavu"})
+    )
+    writer.start()
+    # Give the writer the chance to overtake the reader's slow load.
+    writer.join(timeout=0.2)
+    store.release.set()
+    reader.join(timeout=5)
+    writer.join(timeout=5)
+    handler._save_user_settings("user:u3", {"font": "hiragino"})
+
+    assert store.load_count == 1
+    assert store.data == {
+        "user:u1": {"font": "mincho"},
+        "user:u2": {"font": "dejavu"},
+        "user:u3": {"font": "hiragino"},
+    }
+
+
+def test_setting_command_updates_font():
+    store = InMemoryStore()
+    generator = DummyGenerator()
+    logger = DummyLogger()
+    session = DummySession()
+
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -420,22 +635,18 @@ def test_setting_command_updates_font(monkeypatch):
     text, status = handler.handle_callback(body, signature)
     assert status == 200
     assert store.data == {"user:u1": {"font": "mincho"}}
-    assert "UPDATED" in captured["json"]["messages"][0]["text"]
+    assert "UPDATED" in session.calls[-1]["json"]["messages"][0]["text"]
 
 
-def test_help_command_returns_usage(monkeypatch):
+def test_help_command_returns_usage():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    session = DummySession()
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -451,22 +662,18 @@ def test_help_command_returns_usage(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "USAGE"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "USAGE"
 
 
-def test_menu_generate_returns_prompt(monkeypatch):
+def test_menu_generate_returns_prompt():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -482,22 +689,18 @@ def test_menu_generate_returns_prompt(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "SEND TWO CHARS"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "SEND TWO CHARS"
 
 
-def test_menu_register_returns_help(monkeypatch):
+def test_menu_register_returns_help():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    session = DummySession()
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -513,22 +716,18 @@ def test_menu_register_returns_help(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "REGISTER FORMAT"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "REGISTER FORMAT"
 
 
-def test_menu_list_returns_quiz_list(monkeypatch):
+def test_menu_list_returns_quiz_list():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
+    session = DummySession()
 
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     handler.quiz_store.set_word("user:u1", 2, "ab", "intersection", "質問ですか")
     payload = {
         "events": [
@@ -545,22 +744,16 @@ def test_menu_list_returns_quiz_list(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    message = captured["json"]["messages"][0]["text"]
+    message = session.calls[-1]["json"]["messages"][0]["text"]
     assert "1." in message
     assert "2. ab(共通部分)\n@質問ですか" in message
 
 
-def test_menu_settings_returns_settings_quick_reply(monkeypatch):
+def test_menu_settings_returns_settings_quick_reply():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
     handler = _build_handler(
         store,
@@ -568,6 +761,7 @@ def test_menu_settings_returns_settings_quick_reply(monkeypatch):
         logger,
         lambda: None,
         settings_builder=lambda: {"items": [{"type": "action"}]},
+        http_session=session,
     )
     payload = {
         "events": [
@@ -584,22 +778,16 @@ def test_menu_settings_returns_settings_quick_reply(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    message = captured["json"]["messages"][0]
+    message = session.calls[-1]["json"]["messages"][0]
     assert message["text"] == "SETTINGS PROMPT"
     assert "quickReply" in message
 
 
-def test_menu_mode_returns_mode_quick_reply(monkeypatch):
+def test_menu_mode_returns_mode_quick_reply():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
     handler = _build_handler(
         store,
@@ -607,6 +795,7 @@ def test_menu_mode_returns_mode_quick_reply(monkeypatch):
         logger,
         lambda: None,
         mode_builder=lambda: {"items": [{"type": "action"}]},
+        http_session=session,
     )
     payload = {
         "events": [
@@ -623,22 +812,16 @@ def test_menu_mode_returns_mode_quick_reply(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    message = captured["json"]["messages"][0]
+    message = session.calls[-1]["json"]["messages"][0]
     assert message["text"] == "MODE PROMPT"
     assert "quickReply" in message
 
 
-def test_menu_font_returns_font_quick_reply(monkeypatch):
+def test_menu_font_returns_font_quick_reply():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
     handler = _build_handler(
         store,
@@ -646,6 +829,7 @@ def test_menu_font_returns_font_quick_reply(monkeypatch):
         logger,
         lambda: None,
         font_builder=lambda: {"items": [{"type": "action"}]},
+        http_session=session,
     )
     payload = {
         "events": [
@@ -662,24 +846,20 @@ def test_menu_font_returns_font_quick_reply(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    message = captured["json"]["messages"][0]
+    message = session.calls[-1]["json"]["messages"][0]
     assert message["text"] == "FONT PROMPT"
     assert "quickReply" in message
 
 
-def test_mode_union_sets_setting(monkeypatch):
+def test_mode_union_sets_setting():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
+    session = DummySession()
 
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -697,24 +877,20 @@ def test_mode_union_sets_setting(monkeypatch):
     assert status == 200
     assert store.data["user:u1"]["quiz_mode"] == "union"
     assert (
-        captured["json"]["messages"][0]["text"]
+        session.calls[-1]["json"]["messages"][0]["text"]
         == "MODE UNION\n設定した値は今後追加された問題に適用されます。"
     )
 
 
-def test_menu_usage_returns_usage(monkeypatch):
+def test_menu_usage_returns_usage():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    session = DummySession()
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -730,22 +906,18 @@ def test_menu_usage_returns_usage(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "USAGE"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "USAGE"
 
 
-def test_invalid_font_replies_with_error(monkeypatch):
+def test_invalid_font_replies_with_error():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -761,22 +933,18 @@ def test_invalid_font_replies_with_error(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "invalid font"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "invalid font"
 
 
-def test_not_two_chars_returns_notice(monkeypatch):
+def test_not_two_chars_returns_notice():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    session = DummySession()
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -792,22 +960,18 @@ def test_not_two_chars_returns_notice(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "NOT TWO CHARS"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "NOT TWO CHARS"
 
 
-def test_invalid_word_replies_with_notice(monkeypatch):
+def test_invalid_word_replies_with_notice():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
+    session = DummySession()
 
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -823,22 +987,18 @@ def test_invalid_word_replies_with_notice(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "INVALID WORD"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "INVALID WORD"
 
 
-def test_quiz_register_with_three_chars(monkeypatch):
+def test_quiz_register_with_three_chars():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    session = DummySession()
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -858,19 +1018,15 @@ def test_quiz_register_with_three_chars(monkeypatch):
     assert handler.quiz_store.data["user:u1"][1]["quiz_mode"] == "intersection"
 
 
-def test_quiz_register_invalid_word(monkeypatch):
+def test_quiz_register_invalid_word():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -886,22 +1042,18 @@ def test_quiz_register_invalid_word(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "INVALID WORD"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "INVALID WORD"
 
 
-def test_quiz_register_invalid_number(monkeypatch):
+def test_quiz_register_invalid_number():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    session = DummySession()
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -917,22 +1069,18 @@ def test_quiz_register_invalid_number(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "INVALID NUMBER"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "INVALID NUMBER"
 
 
-def test_quiz_register_invalid_word_after_dot(monkeypatch):
+def test_quiz_register_invalid_word_after_dot():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
+    session = DummySession()
 
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -948,22 +1096,18 @@ def test_quiz_register_invalid_word_after_dot(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "INVALID WORD"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "INVALID WORD"
 
 
-def test_quiz_register_too_short_word(monkeypatch):
+def test_quiz_register_too_short_word():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
+    session = DummySession()
 
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None)
+    handler = _build_handler(
+        store, generator, logger, lambda: None, http_session=session
+    )
     payload = {
         "events": [
             {
@@ -979,22 +1123,18 @@ def test_quiz_register_too_short_word(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "NOT TWO CHARS"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "NOT TWO CHARS"
 
 
-def test_group_bot_mention_invalid_number(monkeypatch):
+def test_group_bot_mention_invalid_number():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    session = DummySession()
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None, bot_user_id="bot")
+    handler = _build_handler(
+        store, generator, logger, lambda: None, bot_user_id="bot", http_session=session
+    )
     payload = {
         "events": [
             {
@@ -1015,24 +1155,20 @@ def test_group_bot_mention_invalid_number(monkeypatch):
     text, status = handler.handle_callback(body, signature)
     assert status == 200
     assert (
-        captured["json"]["messages"][0]["text"]
+        session.calls[-1]["json"]["messages"][0]["text"]
         == "出題時は「@文字合成ボット (問題番号)」と送ってください。"
     )
 
 
-def test_group_bot_mention_unregistered(monkeypatch):
+def test_group_bot_mention_unregistered():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
-    handler = _build_handler(store, generator, logger, lambda: None, bot_user_id="bot")
+    handler = _build_handler(
+        store, generator, logger, lambda: None, bot_user_id="bot", http_session=session
+    )
     payload = {
         "events": [
             {
@@ -1052,23 +1188,19 @@ def test_group_bot_mention_unregistered(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "1問目は未登録です。"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "1問目は未登録です。"
 
 
-def test_group_bot_mention_union_image(monkeypatch):
+def test_group_bot_mention_union_image():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
     store.data["user:u1"] = {"quiz_mode": "union"}
-    handler = _build_handler(store, generator, logger, lambda: None, bot_user_id="bot")
+    handler = _build_handler(
+        store, generator, logger, lambda: None, bot_user_id="bot", http_session=session
+    )
     handler.quiz_store.set_word("user:u1", 1, "ab", "union")
     payload = {
         "events": [
@@ -1089,7 +1221,7 @@ def test_group_bot_mention_union_image(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    messages = captured["json"]["messages"]
+    messages = session.calls[-1]["json"]["messages"]
     assert messages[0]["type"] == "text"
     assert messages[0]["text"] == "UNION?"
     assert messages[1]["type"] == "image"
@@ -1098,19 +1230,15 @@ def test_group_bot_mention_union_image(monkeypatch):
     assert messages[2]["text"] == "ANSWER @Tester 1.(解答)"
 
 
-def test_group_answer_format_error(monkeypatch):
+def test_group_answer_format_error():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
-    handler = _build_handler(store, generator, logger, lambda: None, bot_user_id="bot")
+    handler = _build_handler(
+        store, generator, logger, lambda: None, bot_user_id="bot", http_session=session
+    )
     payload = {
         "events": [
             {
@@ -1131,24 +1259,20 @@ def test_group_answer_format_error(monkeypatch):
     text, status = handler.handle_callback(body, signature)
     assert status == 200
     assert (
-        captured["json"]["messages"][0]["text"]
+        session.calls[-1]["json"]["messages"][0]["text"]
         == "解答は以下のフォーマットで送信してください。\n@出題者へのメンション (問題番号).(解答)"
     )
 
 
-def test_group_answer_correct(monkeypatch):
+def test_group_answer_correct():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
-    handler = _build_handler(store, generator, logger, lambda: None, bot_user_id="bot")
+    handler = _build_handler(
+        store, generator, logger, lambda: None, bot_user_id="bot", http_session=session
+    )
     handler.quiz_store.set_word("user:u2", 1, "音楽性", "intersection")
     payload = {
         "events": [
@@ -1169,23 +1293,19 @@ def test_group_answer_correct(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    message = captured["json"]["messages"][0]
+    message = session.calls[-1]["json"]["messages"][0]
     assert message["text"] == "Testerさん、CORRECTです。"
 
 
-def test_group_answer_unregistered(monkeypatch):
+def test_group_answer_unregistered():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
-    handler = _build_handler(store, generator, logger, lambda: None, bot_user_id="bot")
+    handler = _build_handler(
+        store, generator, logger, lambda: None, bot_user_id="bot", http_session=session
+    )
     payload = {
         "events": [
             {
@@ -1205,22 +1325,18 @@ def test_group_answer_unregistered(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "1問目は未登録です。"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "1問目は未登録です。"
 
 
-def test_group_answer_release_invalid_format(monkeypatch):
+def test_group_answer_release_invalid_format():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
-    handler = _build_handler(store, generator, logger, lambda: None, bot_user_id="bot")
+    handler = _build_handler(
+        store, generator, logger, lambda: None, bot_user_id="bot", http_session=session
+    )
     payload = {
         "events": [
             {
@@ -1241,24 +1357,20 @@ def test_group_answer_release_invalid_format(monkeypatch):
     text, status = handler.handle_callback(body, signature)
     assert status == 200
     assert (
-        captured["json"]["messages"][0]["text"]
+        session.calls[-1]["json"]["messages"][0]["text"]
         == "解答発表は「@文字合成ボット 答え (問題番号)」と送ってください。"
     )
 
 
-def test_group_answer_release_two_chars(monkeypatch):
+def test_group_answer_release_two_chars():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
-    handler = _build_handler(store, generator, logger, lambda: None, bot_user_id="bot")
+    handler = _build_handler(
+        store, generator, logger, lambda: None, bot_user_id="bot", http_session=session
+    )
     handler.quiz_store.set_word("user:u1", 1, "ab", "intersection")
     payload = {
         "events": [
@@ -1279,24 +1391,20 @@ def test_group_answer_release_two_chars(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    message = captured["json"]["messages"][0]
+    message = session.calls[-1]["json"]["messages"][0]
     assert message["type"] == "image"
     assert message["originalContentUrl"].endswith("/a/ab")
 
 
-def test_group_answer_release_video(monkeypatch):
+def test_group_answer_release_video():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
-
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
+    session = DummySession()
 
-    handler = _build_handler(store, generator, logger, lambda: None, bot_user_id="bot")
+    handler = _build_handler(
+        store, generator, logger, lambda: None, bot_user_id="bot", http_session=session
+    )
     handler.quiz_store.set_word("user:u1", 1, "abcd", "union")
     payload = {
         "events": [
@@ -1317,24 +1425,22 @@ def test_group_answer_release_video(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    message = captured["json"]["messages"][0]
+    message = session.calls[-1]["json"]["messages"][0]
     assert message["type"] == "video"
     assert message["originalContentUrl"].endswith("/v/abcd.mp4")
+    handler._io_pool.shutdown(wait=True)
+    assert handler.image_store.cleaned == [["/tmp/V_abcd.mp4", "/tmp/P_abcd.png"]]
 
 
-def test_bulk_quiz_list_update(monkeypatch):
+def test_bulk_quiz_list_update():
     store = InMemoryStore()
     generator = DummyGenerator()
     logger = DummyLogger()
-    captured = {}
-
-    def fake_post(url, json=None, headers=None, timeout=None):
-        captured["json"] = json
-        return DummyResponse()
+    session = DummySession()
 
-    monkeypatch.setattr("line.reply.requests.post", fake_post)
-
-    handler = _build_handler(store, generator, logger, lambda: None, bot_user_id="bot")
+    handler = _build_handler(
+        store, generator, logger, lambda: None, bot_user_id="bot", http_session=session
+    )
     handler.quiz_store.set_word("user:u1", 1, "ab", "intersection")
     payload = {
         "events": [
@@ -1354,8 +1460,112 @@ def test_bulk_quiz_list_update(monkeypatch):
 
     text, status = handler.handle_callback(body, signature)
     assert status == 200
-    assert captured["json"]["messages"][0]["text"] == "BULK OK"
+    assert session.calls[-1]["json"]["messages"][0]["text"] == "BULK OK"
     assert handler.quiz_store.get_word("user:u1", 1) == "cd"
     assert handler.quiz_store.get_quiz_item("user:u1", 1)["quiz_prompt"] == "もんだい1"
     assert handler.quiz_store.get_word("user:u1", 2) == ""
     assert handler.quiz_store.get_word("user:u1", 3) == "ef"
+
+
+def test_parse_quiz_message_splits_number_and_word():
+    handler = _build_handler(InMemoryStore(), DummyGenerator(), DummyLogger(), None)
+
+    assert handler._parse_quiz_message(" 3 . 音楽 ") == ("ok", 3, "音楽")
+    assert handler._parse_quiz_message("x.音楽") == ("invalid_number", None, None)
+    assert handler._parse_quiz_message("音楽") is None
+
+
+def test_reply_and_profile_clients_share_the_http_session():
+    session = object()
+    handler = LineHandler(
+        channel_secret="secret",
+        channel_access_token="token",
+        server_fqdn="https://example.com",
+        generator=DummyGenerator(),
+        settings_store=InMemoryStore(),
+        logger=DummyLogger(),
+        texts={},
+        keywords={},
+        quick_reply_builder=lambda: None,
+        image_store=object(),
+        quiz_store=object(),
+        http_session=session,
+    )
+
+    assert handler.reply_client.http is session
+    assert handler.profile_client.http is session
+
+
+def test_quiz_list_text_is_cached_until_store_version_changes():
+    handler = _build_handler(InMemoryStore(), DummyGenerator(), DummyLogger(), None)
+
+    class VersionedQuizStore:
+        def __init__(self):
+            self.items = {1: {"word": "音楽", "quiz_mode": "intersection"}}
+            self.list_count = 0
+            self.stamp = 1
+
+        def version(self, user_id):
+            return self.stamp
+
+        def list_quiz_items(self, user_id):
+            self.list_count += 1
+            return dict(self.items)
+
+    quiz_store = VersionedQuizStore()
+    handler.quiz_store = quiz_store
+
+    first = handler._get_quiz_list_text("user:u1")
+    assert handler._get_quiz_list_text("user:u1") == first
+    assert quiz_store.list_count == 1
+
+    quiz_store.items[2] = {"word": "国語", "quiz_mode": "union"}
+    quiz_store.stamp = 2
+    assert "国語" in handler._get_quiz_list_text("user:u1")
+    assert quiz_store.list_count == 2
+
+
+def test_quiz_list_cache_keeps_recently_used_users_past_capacity(monkeypatch):
+    monkeypatch.setattr("line.handler.QUIZ_LIST_CACHE_SIZE", 2)
+    handler = _build_handler(InMemoryStore(), DummyGenerator(), DummyLogger(), None)
+
+    class CountingQuizStore:
+        def __init__(self):
+            self.listed = []
+
+        def version(self, user_id):
+            return 1
+
+        def list_quiz_items(self, user_id):
+            self.listed.append(user_id)
+            return {}
+
+    quiz_store = CountingQuizStore()
+    handler.quiz_store = quiz_store
+
+    handler._get_quiz_list_text("user:u1")
+    handler._get_quiz_list_text("user:u2")
+    # Reading u1 makes u2 the oldest entry, so caching u3 evicts u2.
+    handler._get_quiz_list_text("user:u1")
+    handler._get_quiz_list_text("user:u3")
+    quiz_store.listed.clear()
+
+    handler._get_quiz_list_text("user:u1")
+    handler._get_quiz_list_text("user:u3")
+    assert quiz_store.listed == []
+    handler._get_quiz_list_text("user:u2")
+    assert quiz_store.listed == ["user:u2"]
+
+
+def test_quiz_list_text_refreshes_after_each_sqlite_write(tmp_path):
+    handler = _build_handler(InMemoryStore(), DummyGenerator(), DummyLogger(), None)
+    handler.quiz_store = SqliteQuizStore(str(tmp_path / "quiz.db"), DummyLogger())
+
+    handler.quiz_store.set_word("user:u1", 1, "音楽")
+    assert "音楽" in handler._get_quiz_list_text("user:u1")
+
+    handler.quiz_store.set_words_bulk("user:u1", {2: ("国語", "union", "")})
+    assert "国語" in handler._get_quiz_list_text("user:u1")
+
+    handler.quiz_store.delete_word("user:u1", 1)
+    assert "音楽" not in handler._get_quiz_list_text("user:u1")
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from line.image_store import GcsImageStore
+
+
+class DummyLogger:
+    def error(self, *args, **kwargs):
+        return None
+
+
+class TokenResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, token):
+        self.token = token
+
+    def json(self):
+        return {"access_token": self.token, "expires_in": 3600}
+
+
+class TokenSession:
+    def __init__(self):
+        self.fetch_count = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.fetch_count += 1
+        return TokenResponse(f"token{self.fetch_count}")
+
+
+def _gcs_store(session):
+    return GcsImageStore("bucket", "prefix", DummyLogger(), session=session)
+
+
+def test_gcs_access_token_is_reused_until_near_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("line.image_store.time.monotonic", lambda: now[0])
+    session = TokenSession()
+    store = _gcs_store(session)
+
+    assert store._get_gcs_access_token() == "token1"
+    now[0] += 3000
+    assert store._get_gcs_access_token() == "token1"
+    assert session.fetch_count == 1
+
+
+def test_gcs_access_token_is_refreshed_within_the_margin(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("line.image_store.time.monotonic", lambda: now[0])
+    session = TokenSession()
+    store = _gcs_store(session)
+
+    assert store._get_gcs_access_token() == "token1"
+    # 30 seconds before the token expires, inside the 60 second margin.
+    now[0] += 3570
+    assert store._get_gcs_access_token() == "token2"
+    assert session.fetch_count == 2
+
+
+def test_gcs_date_prefix_is_formatted_once_per_utc_day(monkeypatch):
+    now = [1700000000.0]  # 2023-11-14 22:13:20 UTC
+    formatted = []
+
+    class CountingDatetime(datetime):
+        @classmethod
+        def fromtimestamp(cls, *args, **kwargs):
+            formatted.append(args[0])
+            return datetime.fromtimestamp(*args, **kwargs)
+
+    monkeypatch.setattr("line.image_store.time.time", lambda: now[0])
+    monkeypatch.setattr("line.image_store.datetime", CountingDatetime)
+    store = _gcs_store(TokenSession())
+
+    assert store._get_date_prefix() == "2023/11/14"
+    now[0] += 3000
+    assert store._get_date_prefix() == "2023/11/14"
+    assert len(formatted) == 1
+
+    now[0] += 4000
+    assert store._get_date_prefix() == "2023/11/15"
+    assert len(formatted) == 2
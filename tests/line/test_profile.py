@@ -0,0 +1,81 @@
+import requests
+
+from line.profile import LineProfileClient
+
+
+class DummyLogger:
+    def error(self, *args, **kwargs):
+        return None
+
+
+class ProfileResponse:
+    status_code = 200
+    text = "OK"
+
+    def json(self):
+        return {"displayName": "Alice"}
+
+
+class DummySession:
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.urls.append(url)
+        return ProfileResponse()
+
+
+def test_profile_client_caches_display_names():
+    session = DummySession()
+    client = LineProfileClient("token", DummyLogger(), session)
+    source = {"type": "group", "groupId": "g1"}
+
+    assert client.get_display_name(source, "u1") == "Alice"
+    assert client.get_display_name(source, "u1") == "Alice"
+    assert client.get_display_name({"type": "user"}, "u1") == "Alice"
+    assert session.urls == [
+        "https://api.line.me/v2/bot/group/g1/member/u1",
+        "https://api.line.me/v2/bot/profile/u1",
+    ]
+
+
+def test_profile_client_defaults_to_a_keep_alive_session():
+    client = LineProfileClient("token", DummyLogger())
+
+    assert isinstance(client.http, requests.Session)
+
+
+def test_profile_cache_entry_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("line.profile.time.monotonic", lambda: now[0])
+    monkeypatch.setattr("line.profile.PROFILE_CACHE_TTL", 600)
+    session = DummySession()
+    client = LineProfileClient("token", DummyLogger(), session)
+
+    client.get_display_name({"type": "user"}, "u1")
+    now[0] += 599
+    client.get_display_name({"type": "user"}, "u1")
+    assert len(session.urls) == 1
+
+    now[0] += 1
+    client.get_display_name({"type": "user"}, "u1")
+    assert len(session.urls) == 2
+
+
+def test_profile_cache_evicts_least_recently_used_at_capacity(monkeypatch):
+    monkeypatch.setattr("line.profile.PROFILE_CACHE_SIZE", 2)
+    session = DummySession()
+    client = LineProfileClient("token", DummyLogger(), session)
+
+    client.get_display_name({"type": "user"}, "u1")
+    client.get_display_name({"type": "user"}, "u2")
+    # Reading u1 makes u2 the oldest entry, so adding u3 evicts u2.
+    client.get_display_name({"type": "user"}, "u1")
+    client.get_display_name({"type": "user"}, "u3")
+    session.urls.clear()
+
+    client.get_display_name({"type": "user"}, "u1")
+    client.get_display_name({"type": "user"}, "u3")
+    assert session.urls == []
+    client.get_display_name({"type": "user"}, "u2")
+    assert session.urls == ["https://api.line.me/v2/bot/profile/u2"]
@@ -0,0 +1,193 @@
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+import pytest
+
+from line.quiz_store import DatastoreQuizStore, SqliteQuizStore
+
+FakeKey = namedtuple("FakeKey", "kind name")
+
+
+class DummyLogger:
+    def error(self, *args, **kwargs):
+        return None
+
+
+class FakeDatastoreClient:
+    """In-memory Datastore client; writes inside transaction() apply on commit."""
+
+    def __init__(self, fail_commit=False):
+        self.data = {}
+        self.fail_commit = fail_commit
+        self.get_multi_calls = 0
+        self._pending = None
+
+    def key(self, kind, name):
+        return FakeKey(kind, name)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def get_multi(self, keys):
+        self.get_multi_calls += 1
+        return [self.data[key] for key in keys if key in self.data]
+
+    def put(self, entity):
+        self.put_multi([entity])
+
+    def put_multi(self, entities):
+        self._write([(entity.key, entity) for entity in entities])
+
+    def delete(self, key):
+        self.delete_multi([key])
+
+    def delete_multi(self, keys):
+        self._write([(key, None) for key in keys])
+
+    @contextmanager
+    def transaction(self):
+        self._pending = []
+        try:
+            yield
+            if self.fail_commit:
+                raise RuntimeError("commit failed")
+            self._apply(self._pending)
+        finally:
+            self._pending = None
+
+    def _write(self, mutations):
+        if self._pending is not None:
+            self._pending.extend(mutations)
+        else:
+            self._apply(mutations)
+
+    def _apply(self, mutations):
+        for key, entity in mutations:
+            if entity is None:
+                self.data.pop(key, None)
+            else:
+                self.data[key] = entity
+
+
+def _datastore_store(client):
+    return DatastoreQuizStore("project", DummyLogger(), client=client)
+
+
+def test_datastore_lists_filled_slots_with_one_batched_lookup():
+    client = FakeDatastoreClient()
+    store = _datastore_store(client)
+    store.set_word("user:u1", 1, "ab", "union", "q")
+    store.set_word("user:u1", 3, "")
+    store.set_word("user:u1", 10, "cd")
+    store.set_word("user:u2", 2, "ef")
+
+    assert store.list_words("user:u1") == {1: "ab", 10: "cd"}
+    assert store.list_quiz_items("user:u1") == {
+        1: {"word": "ab", "quiz_mode": "union", "quiz_prompt": "q"},
+        10: {"word": "cd", "quiz_mode": "intersection", "quiz_prompt": ""},
+    }
+    assert client.get_multi_calls == 2
+
+
+def test_datastore_bulk_update_applies_puts_and_deletes():
+    client = FakeDatastoreClient()
+    store = _datastore_store(client)
+    store.set_word("user:u1", 1, "ab")
+    store.set_word("user:u1", 2, "cd")
+
+    store.set_words_bulk(
+        "user:u1", {1: None, 2: ("ef", "union", "q"), 3: ("gh", "intersection", "")}
+    )
+
+    assert store.list_words("user:u1") == {2: "ef", 3: "gh"}
+
+
+def test_datastore_bulk_update_writes_nothing_when_commit_fails():
+    client = FakeDatastoreClient()
+    store = _datastore_store(client)
+    store.set_word("user:u1", 1, "ab")
+    client.fail_commit = True
+
+    with pytest.raises(RuntimeError):
+        store.set_words_bulk("user:u1", {1: None, 2: ("cd", "intersection", "")})
+
+    assert store.list_words("user:u1") == {1: "ab"}
+
+
+def _sqlite_store(tmp_path):
+    return SqliteQuizStore(str(tmp_path / "quiz.db"), DummyLogger())
+
+
+def test_sqlite_bulk_update_applies_upserts_and_deletes(tmp_path):
+    store = _sqlite_store(tmp_path)
+    store.set_word("user:u1", 1, "ab")
+    store.set_word("user:u1", 2, "cd")
+
+    store.set_words_bulk(
+        "user:u1", {1: None, 2: ("ef", "union", "q"), 3: ("gh", "intersection", "")}
+    )
+
+    assert store.list_quiz_items("user:u1") == {
+        2: {"word": "ef", "quiz_mode": "union", "quiz_prompt": "q"},
+        3: {"word": "gh", "quiz_mode": "intersection", "quiz_prompt": ""},
+    }
+
+
+def test_sqlite_bulk_update_rolls_back_when_a_row_fails(tmp_path):
+    store = _sqlite_store(tmp_path)
+    store.set_word("user:u1", 1, "ab")
+    store.set_word("user:u1", 2, "cd")
+
+    # The NULL word violates NOT NULL after the delete and first upsert ran.
+    with pytest.raises(sqlite3.IntegrityError):
+        store.set_words_bulk(
+            "user:u1",
+            {1: None, 2: ("ef", "intersection", ""), 3: (None, "intersection", "")},
+        )
+
+    assert store.list_words("user:u1") == {1: "ab", 2: "cd"}
+
+
+def test_sqlite_store_shares_one_connection_across_threads(tmp_path):
+    store = _sqlite_store(tmp_path)
+    errors = []
+
+    def write(user):
+        try:
+            for number in range(1, 11):
+                store.set_word(f"user:u{user}", number, f"w{user}-{number}")
+                store.list_words(f"user:u{user}")
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(user,)) for user in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    journal_mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal_mode == "wal"
+    reopened = _sqlite_store(tmp_path)
+    for user in range(8):
+        assert reopened.list_words(f"user:u{user}") == {
+            number: f"w{user}-{number}" for number in range(1, 11)
+        }
+
+
+def test_sqlite_version_changes_on_every_write(tmp_path):
+    store = _sqlite_store(tmp_path)
+    versions = [store.version("user:u1")]
+
+    store.set_word("user:u1", 1, "ab")
+    versions.append(store.version("user:u1"))
+    store.set_words_bulk("user:u1", {2: ("cd", "intersection", "")})
+    versions.append(store.version("user:u1"))
+    store.delete_word("user:u1", 1)
+    versions.append(store.version("user:u1"))
+
+    assert len(set(versions)) == 4
+    assert store.version("user:u2") == 0
@@ -0,0 +1,51 @@
+import requests
+
+from line.reply import LineReplyClient
+
+
+class DummyLogger:
+    def __init__(self):
+        self.errors = []
+
+    def error(self, *args, **kwargs):
+        self.errors.append(args)
+
+
+class DummyResponse:
+    def __init__(self, status_code=200, text="OK"):
+        self.status_code = status_code
+        self.text = text
+
+
+class DummySession:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.calls = []
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.calls.append((url, json, headers))
+        return DummyResponse(self.status_code)
+
+
+def test_reply_client_posts_through_the_given_session():
+    session = DummySession()
+    client = LineReplyClient("token", DummyLogger(), session)
+
+    assert client.reply("rt", [{"type": "text", "text": "hi"}]) is True
+    assert client.reply("rt2", [{"type": "text", "text": "bye"}]) is True
+    assert [call[1]["replyToken"] for call in session.calls] == ["rt", "rt2"]
+    assert session.calls[0][2] == {"Authorization": "Bearer token"}
+
+
+def test_reply_client_defaults_to_a_keep_alive_session():
+    client = LineReplyClient("token", DummyLogger())
+
+    assert isinstance(client.http, requests.Session)
+
+
+def test_reply_client_reports_error_status():
+    logger = DummyLogger()
+    client = LineReplyClient("token", logger, DummySession(status_code=400))
+
+    assert client.reply("rt", [{"type": "text", "text": "hi"}]) is False
+    assert len(logger.errors) == 1